@@ -0,0 +1,106 @@
+"""This module contains the container for the weekly labor force status and hours worked of the
+panel.
+"""
+
+import numpy as np
+
+# The labor force status is stored as a small integer, so missing values are indicated by a
+# negative value. Negative values of the original data are already set to missing.
+MISSING_STATUS = -1
+
+
+class WeeklyActivityCls(object):
+    """This class holds the labor force status and the hours worked in all 52 weeks of a year for
+    each individual and survey year of the panel. Both are stored in contiguous arrays of shape
+    (agents, years, 52). The observations of a dataset are located by their identifier and survey
+    year, so the queries return one row for each observation of the dataset.
+    """
+
+    def __init__(self, df):
+
+        # Class attributes
+        self.identifiers = np.unique(df["IDENTIFIER"].to_numpy())
+        survey_year = df["SURVEY_YEAR"].to_numpy(dtype=np.int64)
+        self.first_year = survey_year.min()
+
+        shape = (len(self.identifiers), survey_year.max() - self.first_year + 1, 52)
+        self.status = np.full(shape, MISSING_STATUS, dtype=np.int16)
+        self.hours = np.full(shape, np.nan, dtype=np.float64)
+
+        agents, years = self._get_positions(df)
+        for num, week_num in enumerate(range(1, 53)):
+            label = "EMP_STATUS_WK_" + repr(week_num)
+            if label in df.columns:
+                status = df[label].to_numpy(dtype=np.float64, na_value=np.nan)
+
+                # We need to ensure that all realizations are within the range of the compact type.
+                cond = ~np.isnan(status)
+                if (status[cond] < 0).any() or (status[cond] > np.iinfo(np.int16).max).any():
+                    raise AssertionError(f"Realizations of {label} exceed the range of int16 ...")
+
+                self.status[agents[cond], years[cond], num] = status[cond]
+
+            label = "EMP_HOURS_WK_" + repr(week_num)
+            if label in df.columns:
+                self.hours[agents, years, num] = df[label].to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+
+    def get_status(self, df, weeks, weeks_next=()):
+        """This method returns the labor force status in the weeks of the year of each observation,
+        followed by the weeks_next of the following year of the same individual.
+        """
+        return self._get_weeks(self.status, MISSING_STATUS, df, weeks, weeks_next)
+
+    def get_hours(self, df, weeks, weeks_next=()):
+        """This method returns the hours worked in the weeks of the year of each observation,
+        followed by the weeks_next of the following year of the same individual.
+        """
+        return self._get_weeks(self.hours, np.nan, df, weeks, weeks_next)
+
+    def count_weeks(self, df, status, weeks, weeks_next=()):
+        """This method counts the weeks in which the labor force status is equal to one of the
+        status, e.g. the weeks in the military (status 7).
+        """
+        return np.isin(self.get_status(df, weeks, weeks_next), status).sum(axis=1)
+
+    def _get_weeks(self, values, missing, df, weeks, weeks_next):
+        """This method selects the weeks of each observation of the dataset. The following year of
+        an individual is its next observation in the dataset, there are no weeks_next for the last
+        observation of each individual.
+        """
+        agents, years = self._get_positions(df)
+        weeks = np.array(weeks, dtype=np.int64) - 1
+        rslt = values[agents[:, None], years[:, None], weeks]
+
+        if len(weeks_next) > 0:
+            years_next = self._get_next_years(agents, years)
+            cond = years_next == -1
+
+            weeks_next = np.array(weeks_next, dtype=np.int64) - 1
+            rslt_next = values[agents[:, None], np.where(cond, 0, years_next)[:, None], weeks_next]
+            rslt_next[cond] = missing
+
+            rslt = np.concatenate([rslt, rslt_next], axis=1)
+
+        return rslt
+
+    def _get_positions(self, df):
+        """This method returns the position of the individual and the year of each observation."""
+        agents = np.searchsorted(self.identifiers, df["IDENTIFIER"].to_numpy())
+        years = df["SURVEY_YEAR"].to_numpy(dtype=np.int64) - self.first_year
+
+        return agents, years
+
+    def _get_next_years(self, agents, years):
+        """This method returns the position of the year of the next observation of the same
+        individual, which corresponds to shift(-1) within the observations of each individual. It
+        is -1 for the last observation of each individual.
+        """
+        order = np.argsort(agents, kind="stable")
+        cond = agents[order][1:] == agents[order][:-1]
+
+        years_next = np.full(len(agents), -1, dtype=np.int64)
+        years_next[order[:-1][cond]] = years[order][1:][cond]
+
+        return years_next
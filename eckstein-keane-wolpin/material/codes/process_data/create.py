@@ -1,12 +1,86 @@
 #!/usr/bin/env python
-"""
-"""
+"""This script runs the stages that construct the final datasets from the raw panel dataset."""
+
 import os
+from pathlib import Path
+
+from pipeline import run_pipeline
+from pipeline import Stage
+
+PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
+
+CODES_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/codes/process_data"
+SOURCES_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources"
+OUTPUT_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data"
+PYTHON_DIR = f"{PROJECT_DIR}/python"
+
+# The crosswalk only depends on its source file and the preliminary adjustments only depend on the
+# raw panel dataset. Both branches run concurrently and are joined before the final cleaning.
+STAGES = []
+STAGES += [
+    Stage(
+        "xwalk_with_categories",
+        CODES_DIR,
+        [f"{SOURCES_DIR}/occ_crosswalks/occ1990_xwalk.xls"]
+        + [f"{CODES_DIR}/functions_occupation_lookup.py"]
+        + [f"{CODES_DIR}/functions_extended_clean.py", f"{CODES_DIR}/clsWeeklyActivity.py"],
+        [f"{OUTPUT_DIR}/interim/categorized_xwalk.pkl"]
+        + [f"{OUTPUT_DIR}/interim/categorized_xwalk.npy"]
+        + [f"{OUTPUT_DIR}/interim/categorized_xwalk.json"],
+    )
+]
+STAGES += [
+    Stage(
+        "preliminary_data_adjustments",
+        CODES_DIR,
+        [f"{OUTPUT_DIR}/raw/ekw_raw.parquet"]
+        + [f"{SOURCES_DIR}/manual_corrections.csv"]
+        + [f"{CODES_DIR}/functions_prelim_adjust.py"]
+        + [f"{PYTHON_DIR}/sharding.py", f"{PYTHON_DIR}/storage.py"],
+        [f"{OUTPUT_DIR}/interim/ekw_interim.parquet"],
+    )
+]
+STAGES += [
+    Stage(
+        "get_occ_codes_kw97",
+        CODES_DIR,
+        [f"{OUTPUT_DIR}/interim/ekw_interim.parquet", f"{CODES_DIR}/functions_prelim_adjust.py"]
+        + [f"{PYTHON_DIR}/storage.py"],
+        [f"{OUTPUT_DIR}/interim/jobs_with_occ_codes.parquet"],
+    )
+]
+STAGES += [
+    Stage(
+        "extended_kw97_dataclean",
+        CODES_DIR,
+        [f"{OUTPUT_DIR}/interim/ekw_interim.parquet"]
+        + [f"{OUTPUT_DIR}/interim/jobs_with_occ_codes.parquet"]
+        + [f"{OUTPUT_DIR}/interim/categorized_xwalk.npy"]
+        + [f"{OUTPUT_DIR}/interim/categorized_xwalk.json"]
+        + [f"{SOURCES_DIR}/occ_crosswalks/occ1990_xwalk.xls"]
+        + [f"{CODES_DIR}/xwalk_with_categories.py"]
+        + [f"{SOURCES_DIR}/gnp_deflator_data/st_louis_fed_deflator.csv"]
+        + [f"{CODES_DIR}/functions_extended_clean.py"]
+        + [f"{CODES_DIR}/functions_occupation_lookup.py"]
+        + [f"{CODES_DIR}/functions_prelim_adjust.py"]
+        + [f"{CODES_DIR}/clsWeeklyActivity.py"]
+        + [f"{PYTHON_DIR}/sharding.py", f"{PYTHON_DIR}/storage.py"],
+        [f"{OUTPUT_DIR}/final/ekw_ext_all_vars.pkl"]
+        + [f"{OUTPUT_DIR}/final/cont_ekw_ext_all_vars.pkl"]
+        + [f"{PROJECT_DIR}/eckstein-keane-wolpin/eckstein-keane-wolpin-extended.csv"]
+        + [f"{PROJECT_DIR}/eckstein-keane-wolpin/eckstein-keane-wolpin.csv"],
+    )
+]
+STAGES += [
+    Stage(
+        "testing",
+        CODES_DIR,
+        [f"{OUTPUT_DIR}/final/ekw_ext_all_vars.pkl", f"{CODES_DIR}/functions_prelim_adjust.py"]
+        + [f"{CODES_DIR}/functions_extended_clean.py", f"{CODES_DIR}/clsWeeklyActivity.py"]
+        + [f"{CODES_DIR}/functions_occupation_lookup.py", f"{PYTHON_DIR}/sharding.py"],
+        [],
+    )
+]
 
-for file in [
-    "xwalk_with_categories",
-    "preliminary_data_adjustments",
-    "extended_kw97_dataclean",
-    "testing",
-]:
-    os.system(f"python {file}.py")
+if __name__ == "__main__":
+    run_pipeline(STAGES, f"{OUTPUT_DIR}/pipeline_state.json")
@@ -7,17 +7,25 @@ import os
 import numpy as np
 import pandas as pd
 
-from functions_extended_clean import get_occ_hours
-from functions_extended_clean import weeks_hours_worked
-from functions_extended_clean import clean_missing_wages
-from functions_extended_clean import create_wages
-from functions_extended_clean import create_military_wages
+from clsWeeklyActivity import WeeklyActivityCls
+from functions_extended_clean import CHOICE_DTYPE
+from functions_extended_clean import get_occ_choices_vectorized
+from functions_extended_clean import get_occ_hours_vectorized
+from functions_extended_clean import weeks_hours_worked_vectorized
+from functions_extended_clean import clean_missing_wages_vectorized
+from functions_extended_clean import create_wages_vectorized
+from functions_extended_clean import create_military_wages_vectorized
 from functions_extended_clean import get_schooling_experience
+from functions_occupation_lookup import get_occupation_lookup_key
+from functions_occupation_lookup import load_occupation_lookup
+from functions_prelim_adjust import get_school_enrollment
+from sharding import apply_by_agent
+from storage import load_dataset
 
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
-df = pd.read_pickle(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/ekw_interim.pkl"
+df = load_dataset(
+    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/ekw_interim.parquet"
 )
 
 # Construct variable that indicates whether or not an individual completed a grade in a given year,
@@ -30,25 +38,29 @@ df.loc[cond, "GRADE_COMPLETED"] = 0
 
 # Merge the dataframe with the disentangled information on weekly jobs (occupation codes)
 # and wages from get_occ_codes_kw97.py
-job_choice_df = pd.read_pickle(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/jobs_with_occ_codes.pkl"
+job_choice_df = load_dataset(
+    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/jobs_with_occ_codes.parquet"
 )
 job_choice_df.index.rename(["Identifier", "Survey Year"], inplace=True)
 
 df = df.merge(job_choice_df, how="left", left_index=True, right_index=True)
 
 # Initialize the choice variable
-df["CHOICE"] = np.nan
+df["CHOICE"] = pd.Series(np.nan, index=df.index, dtype=CHOICE_DTYPE)
 
 # check whether the requirements for the choice "schooling" (see p. 483 and footnote 15
 # on p. 484 in KW97) are fulfilled and code the responding observations accordingly
 
 # Condition 1: "An individual ist considered to have attended school
 # during the year if the individual attended in any of the three weeks..."
-school_cond_1 = (
-    df["ENROLLED_SCHOOL_APRIL"].shift(-1).eq(1.0)
-    | df["ENROLLED_SCHOOL_JANUARY"].shift(-1).eq(1.0)
-    | df["ENROLLED_SCHOOL_OCTOBER"].eq(1.0)
+# The monthly school enrollment is ordered from January to December. The enrollment in January
+# and April is taken from the next row.
+enrollment = get_school_enrollment(df)
+enrollment_next = np.append(enrollment[1:], np.full((1, 12), -1, dtype=np.int8), axis=0)
+
+school_cond_1 = pd.Series(
+    (enrollment_next[:, 3] == 1) | (enrollment_next[:, 0] == 1) | (enrollment[:, 9] == 1),
+    index=df.index,
 )
 
 # Condition 2: "... and the individual reported completing one grade level by October 1
@@ -58,9 +70,9 @@ school_cond_2 = df["GRADE_COMPLETED"].ge(1.0)  # 'GRADE_COMPLETED' might be larg
 # Create variable which counts the number of attendance data points [October 1, January 1, April 1]
 # non-missing in a given year
 df["SCHOOL_NONMISSING_MONTHS"] = (
-    (~(df["ENROLLED_SCHOOL_OCTOBER"].isna())).astype(int)
-    + (~(df["ENROLLED_SCHOOL_JANUARY"].shift(-1).isna())).astype(int)
-    + (~(df["ENROLLED_SCHOOL_APRIL"].shift(-1).isna())).astype(int)
+    (enrollment[:, 9] != -1).astype(int)
+    + (enrollment_next[:, 0] != -1).astype(int)
+    + (enrollment_next[:, 3] != -1).astype(int)
 )
 
 # Condition 3: All 3 attendance data points are non-missing
@@ -81,9 +93,13 @@ df.loc[(school_cond_2 & school_cond_4), "CHOICE"] = "schooling"
 # individuals are assigned to have chosen 'schooling' in 1978 if they completed a grade in this year
 df.loc[(df["SURVEY_YEAR"].eq(1978)) & school_cond_2, "CHOICE"] = "schooling"
 
+# The weekly labor force status and hours worked of the panel are held in arrays, so the weeks of
+# a year and of the following year are selected at once.
+activity = WeeklyActivityCls(df)
+
 # check whether the requirements for the choice "work" (see p. 484 in KW97; will below be
 # separated in blue, white, military)
-df = df.groupby(df["IDENTIFIER"]).apply(lambda x: weeks_hours_worked(x))
+df = weeks_hours_worked_vectorized(df, activity)
 
 # Condition 1: individual was employed in at least two-thirds of the (non-missing) weeks
 work_cond_1 = (df["WORKED_WEEKS"] / df["EMP_NONMISSING_WEEKS"]).ge(2 / 3)
@@ -126,128 +142,50 @@ df.sort_index(inplace=True)
 # Translate the occupation codes in the "CHOICE_WK" variables to white/blue collar taking
 # into account the change of occupation coding in 2002 and 2004
 
-# Read in csv-file
-categories_df = pd.read_pickle(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/categorized_xwalk.pkl"
-)
-
-categories_df.columns = [
-    "OCC1990",
-    "DESCRIPTION",
-    "CPS_1970",
-    "CPS_2000_1",
-    "CPS_2000_5",
-    "CATEGORY",
-    "CPS_2002",
-]
-
-# Construct dictionaries that assigns blue- or white-collar to each occupation for each set of
-# occupation codes (1970, 2000, 2002)
-cond_1 = categories_df.CPS_1970.isin(range(1, 1000))
-category_dict_1970 = dict(
-    zip(categories_df.CPS_1970[cond_1].astype("Int64"), categories_df.CATEGORY[cond_1])
-)
-
-cond_2 = categories_df.CPS_2000_1.isin(range(1, 1000))
-category_dict_2000 = dict(
-    zip(categories_df.CPS_2000_1[cond_2].astype("Int64"), categories_df.CATEGORY[cond_2])
+# The crosswalk stage stores an array that assigns blue- or white-collar to each occupation for
+# each set of occupation codes (1970, 2000, 2002)
+occupation_lookup = load_occupation_lookup(
+    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/categorized_xwalk.npy",
+    get_occupation_lookup_key(
+        f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/occ_crosswalks/occ1990_xwalk.xls"
+    ),
 )
 
-cond_3 = categories_df.CPS_2002.isin(range(1, 10000))
-category_dict_2002 = dict(
-    zip(categories_df.CPS_2002[cond_3].astype("Int64"), categories_df.CATEGORY[cond_3])
-)
-
-for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]:
-    # Initialize variable that contains the chosen occupation (blue-/white-collar, military)
-    # in a given week
-    df["OCC_JC_WK_" + repr(week_num)] = np.nan
-
-    # Before survey round 20 (year 2002), use 1970 occupation codes to convert occupation code
-    # to blue-/white-collar
-    cond_1 = df["ROUND_JOBS_WK_" + repr(week_num)] < 20
-    df.loc[cond_1, "OCC_JC_WK_" + repr(week_num)] = (
-        df.loc[cond_1, "JOB_CHOICE_WK_" + repr(week_num)].astype("Int64").map(category_dict_1970)
-    )
-
-    # For survey round 20 (year 2002), use 2000 occupation codes to convert occupation code
-    # to blue-/white-collar
-    cond_2 = df["ROUND_JOBS_WK_" + repr(week_num)] == 20
-    df.loc[cond_2, "OCC_JC_WK_" + repr(week_num)] = (
-        df.loc[cond_2, "JOB_CHOICE_WK_" + repr(week_num)].astype("Int64").map(category_dict_2000)
-    )
-
-    # From survey round 21 (year 2004) onwards, use 2002 occupation codes to convert
-    # occupation code to blue-/white-collar
-    cond_3 = df["ROUND_JOBS_WK_" + repr(week_num)] > 20
-    df.loc[cond_3, "OCC_JC_WK_" + repr(week_num)] = (
-        df.loc[cond_3, "JOB_CHOICE_WK_" + repr(week_num)].astype("Int64").map(category_dict_2002)
-    )
-
-# Assign occupation choice 'military' for the week if 'EMP_STATUS' of the week == 7
-for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]:
-    cond = df["EMP_STATUS_WK_" + repr(week_num)].eq(7.0)
-    df.loc[cond, "OCC_JC_WK_" + repr(week_num)] = "military"
+# Translate the occupation codes of all weeks, the weeks in the military are assigned the
+# occupation choice 'military'
+df = get_occ_choices_vectorized(df, occupation_lookup)
 
 # Shift military income by 1 given the definition of the variable
 # (TOTAL INCOME FROM MILITARY SERVICE IN PAST CALENDAR YEAR)
-df["INCOME_MILITARY"] = df["INCOME_MILITARY"].groupby(df["IDENTIFIER"]).apply(lambda x: x.shift(-1))
+df["INCOME_MILITARY"] = df.groupby(df["IDENTIFIER"])["INCOME_MILITARY"].shift(-1)
+
+# We now aggregate several metrics related to occupational choice. The weeks 1 to 26 are taken
+# from the following year of an individual.
+weeks, weeks_next = [40, 46, 52], [1, 7, 13, 14, 20, 26]
 
-# We now aggregate several metrics related to occupational choice
+columns = ["OCC_JC_WK_" + repr(week_num) for week_num in weeks]
+columns_next = ["OCC_JC_WK_" + repr(week_num) for week_num in weeks_next]
+occupations = pd.concat([df[columns], df.groupby(df["IDENTIFIER"])[columns_next].shift(-1)], axis=1)
 
 # Weeks spend in white-collar jobs in a given year
-df["WHITE_COLLAR"] = 0
+df["WHITE_COLLAR"] = occupations.eq("white_collar").sum(axis=1)
 
 # Weeks spend in blue-collar jobs in a given year
-df["BLUE_COLLAR"] = 0
+df["BLUE_COLLAR"] = occupations.eq("blue_collar").sum(axis=1)
 
 # Weeks spend in the military in a given year
-df["MILITARY"] = 0
+df["MILITARY"] = occupations.eq("military").sum(axis=1)
 
 # Weeks spend in unemployment (i. e. labor force status == 4) in a given year
-df["UNEMPLOYED"] = 0
+df["UNEMPLOYED"] = activity.count_weeks(df, 4, weeks, weeks_next)
 
 # Weeks spend out of the labor force (i. e. labor force status == 5) in a given year
-df["OUT_OF_LABOR_FORCE"] = 0
+df["OUT_OF_LABOR_FORCE"] = activity.count_weeks(df, 5, weeks, weeks_next)
 
 # Weeks spend unspecified not working (i. e. labor force status == 2) in a given year
-df["NOT_WORKING"] = 0
-
-for week_num in [1, 7, 13, 14, 20, 26]:
-    df["WHITE_COLLAR"] += (
-        (df["OCC_JC_WK_" + repr(week_num)] == "white_collar").astype(int).fillna(0)
-    )
-    df["BLUE_COLLAR"] += (df["OCC_JC_WK_" + repr(week_num)] == "blue_collar").astype(int).fillna(0)
-    df["MILITARY"] += (df["OCC_JC_WK_" + repr(week_num)] == "military").astype(int).fillna(0)
-    df["UNEMPLOYED"] += (df["EMP_STATUS_WK_" + repr(week_num)].eq(4.0)).astype(int).fillna(0)
-    df["OUT_OF_LABOR_FORCE"] += (
-        (df["EMP_STATUS_WK_" + repr(week_num)].eq(5.0)).astype(int).fillna(0)
-    )
-    df["NOT_WORKING"] += (df["EMP_STATUS_WK_" + repr(week_num)].eq(2.0)).astype(int).fillna(0)
-
-for choice in [
-    "WHITE_COLLAR",
-    "BLUE_COLLAR",
-    "MILITARY",
-    "UNEMPLOYED",
-    "OUT_OF_LABOR_FORCE",
-    "NOT_WORKING",
-]:
-    df[choice] = df[choice].shift(-1)
-
-for week_num in [40, 46, 52]:
-    df["WHITE_COLLAR"] += (
-        (df["OCC_JC_WK_" + repr(week_num)] == "white_collar").astype(int).fillna(0)
-    )
-    df["BLUE_COLLAR"] += (df["OCC_JC_WK_" + repr(week_num)] == "blue_collar").astype(int).fillna(0)
-    df["MILITARY"] += (df["OCC_JC_WK_" + repr(week_num)] == "military").astype(int).fillna(0)
-    df["UNEMPLOYED"] += (df["EMP_STATUS_WK_" + repr(week_num)].eq(4.0)).astype(int).fillna(0)
-    df["OUT_OF_LABOR_FORCE"] += (
-        (df["EMP_STATUS_WK_" + repr(week_num)].eq(5.0)).astype(int).fillna(0)
-    )
-    df["NOT_WORKING"] += (df["EMP_STATUS_WK_" + repr(week_num)].eq(2.0)).astype(int).fillna(0)
-
-df = df.groupby(df["IDENTIFIER"]).apply(lambda x: get_occ_hours(x))
+df["NOT_WORKING"] = activity.count_weeks(df, 2, weeks, weeks_next)
+
+df = get_occ_hours_vectorized(df)
 
 # Assign the occupation in which the most weeks were worked in a given year as the work choice
 # in that year if the work criteria are satisfied, i. e. 'CHOICE' == 'Work'
@@ -285,7 +223,7 @@ cond = (df["CHOICE"] == "Potentially military") | (df["CHOICE"].isna()) | (df["C
 df.loc[cond, "CHOICE"] = "home"
 
 # We initialize a new variable so which decomposes the home option
-df["HOME_CHOICE"] = np.nan
+df["HOME_CHOICE"] = pd.Series(np.nan, index=df.index, dtype=CHOICE_DTYPE)
 
 # An individual who stays home and did not work for more than 1/3 of the non-missing weeks
 # (i. e. did not satisfy work_cond_1), are assigned to 'non_working'
@@ -322,11 +260,13 @@ cond = df["CHOICE"].eq("home") & df["HOME_CHOICE"].isna()
 df.loc[cond, "HOME_CHOICE"] = "residual"
 
 # We clean and create the yearly income data
-df = df.groupby(df["IDENTIFIER"]).apply(lambda x: clean_missing_wages(x))
+# The shifts to the following year of an agent are taken within the observations of each agent
+# on the whole panel.
+df = clean_missing_wages_vectorized(df)
 
-df = df.groupby(df["IDENTIFIER"]).apply(lambda x: create_wages(x))
+df = create_wages_vectorized(df)
 
-df = df.groupby(df["IDENTIFIER"]).apply(lambda x: create_military_wages(x))
+df = create_military_wages_vectorized(df, activity)
 
 # We remove the most extreme income outliers, i. e. values that are not within 3 standard
 # deviations of the mean of all income values
@@ -401,6 +341,7 @@ df = df.loc[cond]
 # We construct choices for ages 15 and 16 if they correspond to years 1976 or 1977 in which there
 # is no information on schooling and labor force status available
 df["aux_schooling"] = df["HGC"].copy().shift(-1)
+df["SPECIFIC_CHOICE"] = pd.Series(np.nan, index=df.index, dtype=CHOICE_DTYPE)
 
 cond = df["AGE"].eq(16) & df["HGC"].shift(-1).ge(10) & df["SURVEY_YEAR"].eq(1977)
 df.loc[cond, "CHOICE"] = df.loc[cond, "SPECIFIC_CHOICE"] = "schooling"
@@ -463,7 +404,7 @@ df = df[df["CUTOFF_WORK"] == 0]
 
 # We create a variable which indicates the level of schooling an individual has obtained at a
 # given age
-df = df.groupby(df["IDENTIFIER"]).apply(lambda x: get_schooling_experience(x))
+df = apply_by_agent(df, get_schooling_experience)
 
 # Delete all individuals for which baseline schooling (i. e. schooling at age 16) is less than 7
 cond = df["AGE"].eq(16) & df["SCHOOLING"].lt(7)
@@ -471,6 +412,11 @@ schooling_too_low = df.loc[cond, "IDENTIFIER"].unique()
 
 df.drop(index=schooling_too_low, level=0, inplace=True)
 
+# The labels of the occupations and choices are only attached for the output
+columns = ["CHOICE", "HOME_CHOICE", "SPECIFIC_CHOICE"]
+columns += ["OCC_JC_WK_" + repr(week_num) for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]]
+df[columns] = df[columns].astype(object)
+
 # save data set with all variables, beginning at age 15
 df.to_pickle(f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/final/ekw_ext_all_vars.pkl")
 
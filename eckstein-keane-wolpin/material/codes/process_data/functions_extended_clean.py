@@ -6,6 +6,19 @@ import math
 import numpy as np
 import pandas as pd
 
+from clsWeeklyActivity import MISSING_STATUS
+
+# The occupations and choices are stored as categoricals with a fixed set of labels, so they are
+# held as small integer codes and all comparisons are done on these codes. All variables share the
+# same labels as the weekly occupations are compared to the choice of the year.
+CHOICE_LABELS = []
+CHOICE_LABELS += ["schooling", "white_collar", "blue_collar", "military", "home"]
+CHOICE_LABELS += ["Work", "Potentially military", "unemployed"]
+CHOICE_LABELS += ["not_working", "out_of_labor_force", "part_time_work", "failed_schooling"]
+CHOICE_LABELS += ["residual"]
+
+CHOICE_DTYPE = pd.CategoricalDtype(CHOICE_LABELS)
+
 
 def get_occ_hours(agent):
     """This function calculates the amount of hours worked in each occupation in a given year."""
@@ -277,6 +290,238 @@ def create_military_wages(agent):
     return pd.DataFrame(agent)
 
 
+def get_occ_choices_vectorized(df, lookup):
+    """This function creates the chosen occupation (blue-/white-collar, military) in each of the
+    weeks for the whole panel. The occupation codes of all weeks are translated at once with the
+    array of get_occupation_lookup in functions_occupation_lookup.py.
+    """
+    weeks = [1, 7, 13, 14, 20, 26, 40, 46, 52]
+    jobs = df[["JOB_CHOICE_WK_" + repr(week_num) for week_num in weeks]].to_numpy(dtype=float)
+    rounds = df[["ROUND_JOBS_WK_" + repr(week_num) for week_num in weeks]].to_numpy(dtype=float)
+    status = df[["EMP_STATUS_WK_" + repr(week_num) for week_num in weeks]].to_numpy(dtype=float)
+
+    # Before survey round 20 (year 2002), the 1970 occupation codes are used, for survey round 20
+    # the 2000 occupation codes and from survey round 21 (year 2004) onwards the 2002 occupation
+    # codes.
+    era = np.select([rounds < 20, rounds == 20, rounds > 20], [0, 1, 2], -1)
+
+    cond = (era >= 0) & (jobs >= 0) & (jobs < lookup.shape[1])
+    codes = np.full(jobs.shape, -1, dtype=np.int8)
+    codes[cond] = lookup[era[cond], jobs[cond].astype(np.int64)]
+
+    # Assign occupation choice 'military' for the week if 'EMP_STATUS' of the week == 7
+    codes[status == 7] = CHOICE_DTYPE.categories.get_loc("military")
+
+    for num, week_num in enumerate(weeks):
+        df["OCC_JC_WK_" + repr(week_num)] = pd.Categorical.from_codes(
+            codes[:, num], dtype=CHOICE_DTYPE
+        )
+
+    return df
+
+
+def get_occ_hours_vectorized(df):
+    """This function calculates the amount of hours worked in each occupation in a given year for
+    the whole panel. It produces the same variables as applying get_occ_hours to each agent.
+    """
+    columns = []
+    for week_num in [1, 7, 13, 14, 20, 26]:
+        columns += ["OCC_JC_WK_" + repr(week_num), "EMP_HOURS_WK_" + repr(week_num)]
+    df_next = _get_next_year(df, columns)
+
+    for occ in ["white_collar", "blue_collar"]:
+
+        df[occ.upper() + "_HOURS"] = 0
+
+        for week_num in [1, 7, 13, 14, 20, 26]:
+            cond = (df_next["OCC_JC_WK_" + repr(week_num)] == occ).astype(int).fillna(0)
+            df[occ.upper() + "_HOURS"] += (
+                df_next["EMP_HOURS_WK_" + repr(week_num)].fillna(0).mul(cond)
+            )
+
+        for week_num in [40, 46, 52]:
+            cond = (df["OCC_JC_WK_" + repr(week_num)] == occ).astype(int).fillna(0)
+            df[occ.upper() + "_HOURS"] += df["EMP_HOURS_WK_" + repr(week_num)].fillna(0).mul(cond)
+
+    return df
+
+
+def weeks_hours_worked_vectorized(df, activity):
+    """This function creates the variables that are necessary to check the requirements for
+    the work choices for the whole panel. It produces the same variables as applying
+    weeks_hours_worked to each agent, except for the lists of weekly hours ('HOURS_LIST',
+    'MAX_HOURS') which are replaced by an array with one column for each of the 9 weeks. Both
+    columns are thus not part of the final datasets anymore. The weekly labor force status and
+    hours are taken from the WeeklyActivityCls of the panel.
+    """
+    status = activity.get_status(df, [40, 46, 52], [1, 7, 13, 14, 20, 26])
+    hours = activity.get_hours(df, [40, 46, 52], [1, 7, 13, 14, 20, 26])
+
+    cond_1 = status >= 100
+    cond_2 = status == 7
+
+    df["WORKED_WEEKS"] = (cond_1 | cond_2).sum(axis=1).astype(float)
+
+    df["WORKED_WEEKS_MILITARY"] = cond_2.sum(axis=1).astype(float)
+
+    cond_3 = (status != 0) & (status != MISSING_STATUS)
+    df["EMP_NONMISSING_WEEKS"] = cond_3.sum(axis=1)
+
+    # The weekly hours are accumulated in the order of the weeks, so the sum does not depend on the
+    # summation algorithm of NumPy.
+    hours = np.where(cond_1, np.nan_to_num(hours), 0.0)
+    df["WORKED_HOURS"] = np.cumsum(hours, axis=1)[:, -1]
+
+    df["NECESSARY_WEEKS_WORKED"] = (
+        np.ceil(df["EMP_NONMISSING_WEEKS"] * (2 / 3)) - df["WORKED_WEEKS_MILITARY"]
+    )
+
+    # With the weekly hours of each observation sorted in descending order, the sum of the n
+    # highest values is the n-th cumulative sum, where n is equal to 'NECESSARY_WEEKS_WORKED'.
+    # Observations with no necessary weeks have a sum of zero.
+    cum_max_hours = np.cumsum(np.sort(hours, axis=1)[:, ::-1], axis=1)
+
+    num_weeks = df["NECESSARY_WEEKS_WORKED"].to_numpy()
+    cond = np.isin(num_weeks, [1, 2, 3, 4, 5, 6])
+
+    df["SUM_MAX_HOURS"] = 0.0
+    df.loc[cond, "SUM_MAX_HOURS"] = cum_max_hours[cond, num_weeks[cond].astype(int) - 1]
+
+    return df
+
+
+def clean_missing_wages_vectorized(df):
+    """This function counts the weeks with a job but without wage information for the whole
+    panel. It produces the same variable as applying clean_missing_wages to each agent.
+    """
+    columns = []
+    for week_num in [1, 7, 13, 14, 20, 26]:
+        columns += ["EMP_STATUS_WK_" + repr(week_num), "WAGE_WK_" + repr(week_num)]
+    df_next = _get_next_year(df, columns)
+
+    df["MISSPECIFIED_EMP_STATUS"] = 0
+
+    for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]:
+        source = df if week_num >= 40 else df_next
+        cond = (
+            source["EMP_STATUS_WK_" + repr(week_num)].ge(100)
+            & source["WAGE_WK_" + repr(week_num)].isna()
+        )
+        df["MISSPECIFIED_EMP_STATUS"] += cond.astype(int)
+
+    return df
+
+
+def create_wages_vectorized(df):
+    """This function creates real incomes and average hourly wages for the whole panel. It
+    produces the same variables as applying create_wages to each agent.
+    """
+    df = clean_missing_wages_vectorized(df)
+
+    columns = ["GNP_DEFL_BASE_1987"]
+    for week_num in [1, 7, 13, 14, 20, 26]:
+        columns += ["OCC_JC_WK_" + repr(week_num), "EMP_HOURS_WK_" + repr(week_num)]
+        columns += ["WAGE_WK_" + repr(week_num)]
+    df_next = _get_next_year(df, columns)
+
+    df["SUM_WEEKLY_WAGES"] = 0
+    df["AVG_WEEKLY_WAGE"] = np.nan
+    df["WEEKS_IN_MAJOR_OCC"] = 0
+    df["SUM_HOURLY_WAGES"] = 0
+
+    for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]:
+        source = df if week_num >= 40 else df_next
+
+        cond = (source["OCC_JC_WK_" + repr(week_num)] == df["CHOICE"]).astype(int)
+        nominal_weekly_wage = (
+            source["WAGE_WK_" + repr(week_num)] * source["EMP_HOURS_WK_" + repr(week_num)]
+        )
+        df["SUM_WEEKLY_WAGES"] += (
+            nominal_weekly_wage / source["GNP_DEFL_BASE_1987"] * cond
+        ).fillna(0)
+        df["WEEKS_IN_MAJOR_OCC"] += cond
+        df["SUM_HOURLY_WAGES"] += source["WAGE_WK_" + repr(week_num)] / source["GNP_DEFL_BASE_1987"]
+
+    df["AVG_WEEKLY_WAGE"] = df["SUM_WEEKLY_WAGES"] / (df["WEEKS_IN_MAJOR_OCC"] * 100)
+
+    df["AVERAGE_HOURLY_WAGES"] = df["SUM_HOURLY_WAGES"] / (df["WEEKS_IN_MAJOR_OCC"] * 100)
+
+    df["AVERAGE_HOURLY_WAGES"].replace(np.inf, np.nan, inplace=True)
+
+    df["INCOME"] = np.nan
+
+    cond = df["CHOICE"].isin(["blue_collar", "white_collar"])
+    df.loc[cond, "INCOME"] = df.loc[cond, "AVG_WEEKLY_WAGE"] * 50
+
+    cond = df["MISSPECIFIED_EMP_STATUS"].ge(1)
+    df.loc[cond, "INCOME"] = np.nan
+
+    df.drop(
+        columns=["SUM_WEEKLY_WAGES", "AVG_WEEKLY_WAGE", "WEEKS_IN_MAJOR_OCC", "SUM_HOURLY_WAGES"],
+        inplace=True,
+    )
+
+    return df
+
+
+def create_military_wages_vectorized(df, activity):
+    """This function creates real incomes in the military for the whole panel. It produces the
+    same variables as applying create_military_wages to each agent. The weeks in the military are
+    determined on a single block of the weekly labor force status, which holds all weeks of the
+    year and of the following year of each observation.
+    """
+    is_military = activity.get_status(df, range(1, 53), range(1, 53)) == 7
+    is_military, is_military_next = is_military[:, :52], is_military[:, 52:]
+
+    df["WEEKS_MILITARY_PER_CALENDAR_YEAR"] = is_military.sum(axis=1)
+
+    df["WEEKLY_MILITARY_INCOME"] = df["INCOME_MILITARY"] / df["WEEKS_MILITARY_PER_CALENDAR_YEAR"]
+
+    columns = ["WEEKLY_MILITARY_INCOME", "GNP_DEFL_BASE_1987", "INCOME_MILITARY"]
+    df_next = _get_next_year(df, columns)
+
+    income = (df["WEEKLY_MILITARY_INCOME"] / df["GNP_DEFL_BASE_1987"]).fillna(0).to_numpy()
+    income_next = (
+        (df_next["WEEKLY_MILITARY_INCOME"] / df_next["GNP_DEFL_BASE_1987"]).fillna(0).to_numpy()
+    )
+
+    # The military income of the weeks 1 to 39 is taken from the following year. The weekly
+    # incomes are accumulated in the order of the weeks, so the sum does not depend on the
+    # summation algorithm of NumPy.
+    weekly_income = np.concatenate(
+        [income_next[:, None] * is_military_next[:, :39], income[:, None] * is_military[:, 39:]],
+        axis=1,
+    )
+    df["SUM_MILITARY_INCOME"] = np.cumsum(weekly_income, axis=1)[:, -1]
+    df["WEEKS_IN_MILITARY"] = is_military_next[:, :39].sum(axis=1) + is_military[:, 39:].sum(axis=1)
+
+    df["CALCULATED_MILITARY_INCOME"] = (df["SUM_MILITARY_INCOME"] / df["WEEKS_IN_MILITARY"]) * 50
+
+    cond_1 = df["CHOICE"].eq("military")
+    df.loc[cond_1, "INCOME"] = df.loc[cond_1, "CALCULATED_MILITARY_INCOME"]
+
+    # We select the weeks in the same way as create_military_wages, so the second selection
+    # includes all weeks except 40 and 50.
+    weeks_next = [week_num - 1 for week_num in range(1, 53) if week_num not in [40, 50]]
+    cond_2 = (df["INCOME_MILITARY"].isna() & is_military[:, 39:].any(axis=1)) | (
+        df_next["INCOME_MILITARY"].isna() & is_military_next[:, weeks_next].any(axis=1)
+    )
+
+    df.loc[cond_1 & cond_2, "INCOME"] = np.nan
+
+    df.drop(
+        columns=[
+            "SUM_MILITARY_INCOME",
+            "WEEKLY_MILITARY_INCOME",
+            "WEEKS_IN_MILITARY",
+            "WEEKS_MILITARY_PER_CALENDAR_YEAR",
+        ],
+        inplace=True,
+    )
+
+    return df
+
+
 def get_schooling_experience(agent):
     """This function creates the variable that indicates the level of schooling an individual has
     obtained at a given age"""
@@ -286,3 +531,9 @@ def get_schooling_experience(agent):
     ).cumsum().shift(1).fillna(0)
 
     return agent
+
+
+def _get_next_year(df, columns):
+    """This function returns the values of the columns in the following year of the same agent,
+    which corresponds to shift(-1) within the observations of each agent."""
+    return df.groupby(df["IDENTIFIER"])[columns].shift(-1)
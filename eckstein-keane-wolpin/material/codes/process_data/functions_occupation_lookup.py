@@ -0,0 +1,91 @@
+"""This script contains the functions used to construct the occupation lookup in
+xwalk_with_categories.py and to load it in extended_kw97_dataclean.py. The stored lookup is
+checked against a hash of this module, so it only contains the construction of the lookup.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from functions_extended_clean import CHOICE_DTYPE
+from functions_extended_clean import CHOICE_LABELS
+
+# The occupation lookup holds the category of each occupation code for the three sets of
+# occupation codes. The version has to be increased whenever the layout of the stored lookup
+# changes, so outdated lookups are not used by accident.
+OCCUPATION_ERAS = {
+    "CPS_1970": range(1, 1000),
+    "CPS_2000_1": range(1, 1000),
+    "CPS_2002": range(1, 10000),
+}
+OCCUPATION_LOOKUP_VERSION = 1
+
+
+def get_occupation_lookup(categories_df):
+    """This function returns the occupation category of each occupation code as an array of the
+    codes of CHOICE_DTYPE. There is one row for each set of occupation codes (1970, 2000, 2002),
+    which is indexed by the occupation code. Occupation codes without a category are -1.
+    """
+    lookup = np.full((len(OCCUPATION_ERAS), 10000), -1, dtype=np.int8)
+    for num, (label, codes) in enumerate(OCCUPATION_ERAS.items()):
+        cond = categories_df[label].isin(codes)
+        keys = categories_df.loc[cond, label].astype("Int64").to_numpy(dtype=np.int64)
+        values = pd.Categorical(categories_df.loc[cond, "CATEGORY"], dtype=CHOICE_DTYPE).codes
+
+        # As for a dictionary, the last category of an occupation code that is listed more than
+        # once is used.
+        is_last = ~pd.Index(keys).duplicated(keep="last")
+        lookup[num, keys[is_last]] = values[is_last]
+
+    return lookup
+
+
+def store_occupation_lookup(lookup, fname, key):
+    """This function stores the occupation lookup as an .npy-file, so it can be memory-mapped by
+    the later stages. The version, the hash of the inputs and the labels of the codes are stored
+    next to it in a .json-file.
+    """
+    np.save(fname, lookup)
+    with open(Path(fname).with_suffix(".json"), "w") as outfile:
+        json.dump(_get_lookup_metadata(key), outfile, indent=4)
+
+
+def load_occupation_lookup(fname, key):
+    """This function returns the stored occupation lookup as a read-only memory-mapped array. The
+    key needs to match the hash that is stored with the lookup, see get_occupation_lookup_key.
+    """
+    with open(Path(fname).with_suffix(".json")) as infile:
+        metadata = json.load(infile)
+
+    if metadata != _get_lookup_metadata(key):
+        raise AssertionError(f"The occupation lookup {fname} is outdated.")
+
+    return np.load(fname, mmap_mode="r")
+
+
+def get_occupation_lookup_key(fname_xwalk):
+    """This function returns a hash of the content of all inputs to the occupation lookup, i.e.
+    the crosswalk, its processing in xwalk_with_categories.py and this module. Changes to any of
+    them result in a new key.
+    """
+    directory = Path(__file__).parent
+
+    sha = hashlib.sha256()
+    for fname in [fname_xwalk, directory / "xwalk_with_categories.py", Path(__file__)]:
+        with open(fname, "rb") as infile:
+            sha.update(infile.read())
+
+    return sha.hexdigest()
+
+
+def _get_lookup_metadata(key):
+    """This function returns the description of the occupation lookup that is stored with it."""
+    metadata = dict()
+    metadata["version"] = OCCUPATION_LOOKUP_VERSION
+    metadata["hash"] = key
+    metadata["eras"] = list(OCCUPATION_ERAS.keys())
+    metadata["categories"] = CHOICE_LABELS
+
+    return metadata
@@ -20,6 +20,127 @@ def extend_df(agent):
     return agent
 
 
+def extend_df_vectorized(df):
+    """This function extends the panel so that each individual has observations at the ages 15 to
+    17. It returns the same observations as applying extend_df to each individual.
+
+    The missing ages are added for all individuals in a single reindex and the survey years are
+    recomputed from the age of each individual in the year he turned 25.
+    """
+    cond = df["AGE"].eq(25)
+    aux_age = pd.Series(
+        (df.loc[cond, "SURVEY_YEAR"] - 25).to_numpy(), index=df.loc[cond, "IDENTIFIER"]
+    )
+    if not (aux_age.index.is_unique and df["IDENTIFIER"].isin(aux_age.index).all()):
+        raise AssertionError("Each individual needs to be observed exactly once at age 25.")
+
+    index = pd.MultiIndex.from_arrays([df["IDENTIFIER"], df["AGE"]])
+    padding = pd.MultiIndex.from_product([aux_age.index, np.arange(15, 18)]).difference(index)
+
+    df_ext = df.set_index(index).reindex(index.append(padding)).sort_index()
+
+    # The added observations only carry the identifier and the age. As in the merge of extend_df,
+    # the age keeps its type.
+    identifier = pd.Series(df_ext.index.get_level_values(0), index=df_ext.index)
+    df_ext["IDENTIFIER"] = df_ext["IDENTIFIER"].fillna(identifier)
+    df_ext["AGE"] = df_ext.index.get_level_values(1).astype(df["AGE"].dtype)
+    df_ext.reset_index(drop=True, inplace=True)
+
+    df_ext["SURVEY_YEAR"] = (df_ext["AGE"] + df_ext["IDENTIFIER"].map(aux_age)).astype("Int64")
+
+    return df_ext
+
+
+def interpolate_grades(df, label):
+    """This function fills the gaps of a grade variable for all agents at once. It returns the
+    same values as interpolating linearly inside the observations of each agent and discarding
+    the filled values that do not increase by zero or one grade in each year.
+
+    The panel needs to be sorted by agent. For each missing value, we look up the positions of
+    the closest observed values before and after it. Only gaps that are enclosed by two
+    observations of the same agent are filled.
+    """
+    identifier = df["IDENTIFIER"].to_numpy()
+    values = df[label].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    observed = ~np.isnan(values)
+    pos = np.arange(len(values))
+
+    pos_before = np.maximum.accumulate(np.where(observed, pos, 0))
+    pos_after = np.minimum.accumulate(np.where(observed, pos, len(values) - 1)[::-1])[::-1]
+
+    inside = (
+        ~observed
+        & observed[pos_before]
+        & observed[pos_after]
+        & (identifier[pos_before] == identifier)
+        & (identifier[pos_after] == identifier)
+    )
+
+    # We use the same formula as numpy.interp, which is used by pandas, to obtain identical
+    # values.
+    before, after = pos_before[inside], pos_after[inside]
+    slope = (values[after] - values[before]) / (after - before)
+    values_int = values.copy()
+    values_int[inside] = slope * (pos[inside] - before) + values[before]
+
+    step = np.append(np.diff(values_int), np.nan)
+    values_int[~observed & ~np.isin(step, [0.0, 1.0])] = np.nan
+
+    return pd.Series(values_int, index=df.index)
+
+
+def apply_corrections(df, corrections):
+    """This function applies the manual corrections from the correction table to the panel.
+
+    Each correction refers to an individual and optionally to a range of ages or survey years. Its
+    value either replaces the current value or is added to it, possibly only if the current value
+    equals 'CURRENT_VALUE'. All corrections are matched to the observations in a single join on
+    the identifier. Several corrections of the same value are applied in the order of the table.
+    """
+    if not corrections["VARIABLE"].dropna().isin(["AGE", "SURVEY_YEAR"]).all():
+        raise AssertionError("Corrections can only refer to the age or the survey year.")
+    if not corrections["OPERATION"].isin(["replace", "add"]).all():
+        raise AssertionError("Corrections either replace the current value or add to it.")
+
+    observations = pd.DataFrame(
+        {
+            "IDENTIFIER": df["IDENTIFIER"].to_numpy(),
+            "AGE": df["AGE"].to_numpy(dtype=np.float64, na_value=np.nan),
+            "SURVEY_YEAR": df["SURVEY_YEAR"].to_numpy(dtype=np.float64, na_value=np.nan),
+            "POSITION": np.arange(len(df)),
+        }
+    )
+
+    matches = corrections.reset_index(drop=True).reset_index()
+    matches = matches.merge(observations, on="IDENTIFIER").sort_values("index", kind="stable")
+
+    value = np.where(matches["VARIABLE"].eq("AGE"), matches["AGE"], matches["SURVEY_YEAR"])
+    cond = matches["VARIABLE"].isna() | (
+        (value >= matches["LOWER"].fillna(-np.inf)) & (value <= matches["UPPER"].fillna(np.inf))
+    )
+    matches = matches.loc[cond]
+
+    # The first correction of each value is applied in the first round, the second one in the
+    # second round, and so on.
+    matches["ROUND"] = matches.groupby(["COLUMN", "POSITION"]).cumcount()
+
+    for _, matches_round in matches.groupby("ROUND"):
+        for column, group in matches_round.groupby("COLUMN"):
+            rows = group["POSITION"].to_numpy()
+            current = df[column].iloc[rows].to_numpy(dtype=np.float64, na_value=np.nan)
+
+            new = group["VALUE"].to_numpy(dtype=np.float64, na_value=np.nan)
+            new = np.where(group["OPERATION"].eq("add"), current + new, new)
+
+            required = group["CURRENT_VALUE"].to_numpy(dtype=np.float64, na_value=np.nan)
+            cond = np.isnan(required) | (current == required)
+
+            df.iloc[rows[cond], df.columns.get_loc(column)] = new[cond]
+
+    return df
+
+
 def adjust_hgc_12_for_ged(agent):
     """This function reduces the HGC variable if an increase in the HGC variable
     is caused by the completion of a GED"""
@@ -40,6 +161,30 @@ def adjust_hgc_12_for_ged(agent):
     return agent.drop(columns=["AUX_HGC"])
 
 
+def adjust_hgc_12_for_ged_vectorized(df):
+    """This function reduces the HGC variable of all individuals with a GED at once. It returns the
+    same values as applying adjust_hgc_12_for_ged to each individual who reports a GED.
+
+    The reduction is determined by the first year before the HGC variable jumps to 12 and is
+    subtracted from all values of at least 12 of the same individual.
+    """
+    identifier = df["IDENTIFIER"]
+
+    is_ged = df["WHICH_OF_HS_OR_GED"].eq(2).groupby(identifier).transform("any")
+
+    hgc_ffill = df["HGC"].groupby(identifier).ffill()
+    cond = df["HGC"].groupby(identifier).shift(-1).eq(12) & hgc_ffill.ne(12) & is_ged
+
+    less_years_bc_ged = 12 - hgc_ffill.fillna(0).astype(int)
+    less_years_bc_ged = less_years_bc_ged[cond].groupby(identifier[cond]).first()
+    less_years_bc_ged = identifier.map(less_years_bc_ged).fillna(0)
+
+    cond = df["HGC"].ge(12)
+    df.loc[cond, "HGC"] = df.loc[cond, "HGC"] - less_years_bc_ged[cond]
+
+    return df
+
+
 def simple_two_grade_jump(agent):
     """This function smoothes the HGC variable in cases in which two grades are completed
     in one year and none in the next year so that one grade is completed in each of the two years.
@@ -81,6 +226,60 @@ def months_attended_school(agent):
     return agent
 
 
+def months_attended_school_vectorized(df):
+    """This function calculates the amount of months in which an individual attended school in a
+    given year for all individuals at once. It returns the same values as applying
+    months_attended_school to each individual.
+
+    The panel needs to be sorted by individual. The months from January to September refer to the
+    next year of the same individual.
+    """
+    enrollment = get_school_enrollment(df)
+
+    identifier = df["IDENTIFIER"].to_numpy()
+    is_same_agent = identifier[1:] == identifier[:-1]
+
+    enrollment_next = np.full_like(enrollment, -1)
+    enrollment_next[:-1][is_same_agent] = enrollment[1:][is_same_agent]
+
+    df["MONTHS_ATTENDED_SCHOOL"] = np.sum(enrollment_next[:, :9] == 1, axis=1) + np.sum(
+        enrollment[:, 9:] == 1, axis=1
+    )
+
+    return df
+
+
+def get_school_enrollment(df):
+    """This function returns the monthly school enrollment as an array of type int8 with one row for
+    each observation and one column for each month from January to December. An entry is one if
+    the individual was enrolled, zero if not, and minus one if the information is missing.
+    """
+    months = []
+    months += ["JANUARY", "FEBRUARY", "MARCH", "APRIL", "MAY", "JUNE", "JULY", "AUGUST"]
+    months += ["SEPTEMBER", "OCTOBER", "NOVEMBER", "DECEMBER"]
+
+    values = df[["ENROLLED_SCHOOL_" + month for month in months]].to_numpy(
+        dtype=np.float64, na_value=np.nan
+    )
+
+    enrollment = np.zeros(values.shape, dtype=np.int8)
+    enrollment[values == 1] = 1
+    enrollment[np.isnan(values)] = -1
+
+    return enrollment
+
+
+def get_survey_calendar(first_round, last_round):
+    """This function returns the calendar of the NLSY interviews for the survey rounds from
+    first_round to last_round. Until 1994 (round 16), interviews are conducted annually, afterwards
+    biannually in even numbered years. The calendar contains the year of each survey round.
+    """
+    rounds = np.arange(first_round, last_round + 1)
+    years = np.where(rounds <= 16, rounds + 1978, (rounds - 16) * 2 + 1994)
+
+    return pd.Series(years, index=pd.Index(rounds, name="SURVEY_ROUND"), name="SURVEY_YEAR")
+
+
 def data_shift(agent):
     """The objective of this function is to translate the weekly labor force status
     to valid occupation codes. For this purpose, the labor force status in a given week
@@ -167,3 +366,59 @@ def data_shift(agent):
     ]
 
     return agent
+
+
+def data_shift_vectorized(df):
+    """This function translates the weekly labor force status to valid occupation codes and wages
+    for all agents at once. It returns the same result as applying data_shift to the groups of the
+    identifier.
+
+    For each week, we look up the position of the row that belongs to the survey year given by
+    'JOB_YEAR_WK_*' of the same agent. The job number in 'JOB_NUMBER_WK_*' then selects the
+    occupation code and the wage among the jobs reported in that row.
+    """
+    df_ext = df.copy()
+
+    identifier = df["IDENTIFIER"].to_numpy()
+    survey_year = df["SURVEY_YEAR"].to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = pd.MultiIndex.from_arrays([identifier, survey_year])
+
+    for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]:
+        job_year = df["JOB_YEAR_WK_" + repr(week_num)].to_numpy(dtype=np.float64, na_value=np.nan)
+        pos = rows.get_indexer(pd.MultiIndex.from_arrays([identifier, job_year]))
+        pos[np.isnan(job_year)] = -1
+
+        job_choice = np.full(len(df), np.nan)
+        wage = np.full(len(df), np.nan)
+        for label, values in [("JOB_CHOICE_WK_", job_choice), ("WAGE_WK_", wage)]:
+            if label + repr(week_num) in df.columns:
+                values[:] = df[label + repr(week_num)].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        for num in [1, 2, 3, 4, 5]:
+            cond = df["JOB_NUMBER_WK_" + repr(week_num)].eq(num).to_numpy()
+
+            jobs = df["JOB_" + repr(num)].to_numpy(dtype=np.float64, na_value=np.nan)
+            wages = df["WAGE_HOURLY_JOB_" + repr(num)].to_numpy(dtype=np.float64, na_value=np.nan)
+
+            # Jobs that refer to a survey year that is not part of the panel remain missing.
+            job_choice[cond] = np.where(pos[cond] == -1, np.nan, jobs[pos[cond]])
+            wage[cond] = np.where(pos[cond] == -1, np.nan, wages[pos[cond]])
+
+        df_ext["JOB_CHOICE_WK_" + repr(week_num)] = job_choice
+        df_ext["WAGE_WK_" + repr(week_num)] = wage
+
+    df_ext = df_ext.loc[
+        :,
+        df_ext.columns.str.startswith(
+            ("JOB_CHOICE_WK_", "ROUND_JOBS_WK_", "WAGE_WK_", "SURVEY_ROUND")
+        ),
+    ]
+
+    # We align the index and the order of the rows with the result of applying data_shift to the
+    # groups of the identifier.
+    df_ext.index = pd.MultiIndex.from_arrays(
+        [df["IDENTIFIER"], df.index.get_level_values("Survey Year")]
+    )
+    df_ext = df_ext.iloc[np.argsort(identifier, kind="stable")]
+
+    return df_ext
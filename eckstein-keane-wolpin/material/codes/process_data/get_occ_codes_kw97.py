@@ -9,81 +9,76 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
-from functions_prelim_adjust import data_shift
+from functions_prelim_adjust import data_shift_vectorized
+from functions_prelim_adjust import get_survey_calendar
+from storage import load_dataset
+from storage import store_dataset
 
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
-df = pd.read_pickle(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/ekw_interim.pkl"
-)
-
-# construct a variable that displays which survey round took place in a given year
-# if there was any (, e. g. 1979 = survey round #1)
+# We only load the variables that are needed to translate the weekly labor force status.
+columns = []
+columns += ["IDENTIFIER", "SURVEY_YEAR"]
+columns += ["EMP_STATUS_WK_" + repr(week_num) for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]]
+columns += ["JOB_" + repr(num) for num in [1, 2, 3, 4, 5]]
+columns += ["WAGE_HOURLY_JOB_" + repr(num) for num in [1, 2, 3, 4, 5]]
 
-df["SURVEY_ROUND"] = np.nan
+df = load_dataset(
+    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/ekw_interim.parquet",
+    columns,
+)
 
-# For all years until 1994, interviews are conducted annually
-cond = df["SURVEY_YEAR"] <= 1994
-df.loc[cond, "SURVEY_ROUND"] = (df["SURVEY_YEAR"] - 1978).astype(int)
+weeks = [1, 7, 13, 14, 20, 26, 40, 46, 52]
 
-# After 1994, interviews are conducted biannually in even numbered years
-cond = (df["SURVEY_YEAR"] > 1994) & ~((df["SURVEY_YEAR"] % 2).astype(bool))
-df.loc[cond, "SURVEY_ROUND"] = ((df["SURVEY_YEAR"] - 1994) / 2 + 16).astype(int)
+survey_year = df["SURVEY_YEAR"].to_numpy(dtype=np.int64)
+status = df[["EMP_STATUS_WK_" + repr(week_num) for week_num in weeks]].to_numpy(
+    dtype=np.float64, na_value=np.nan
+)
 
-# For all odd numbered years after 1994, 'SURVEY_ROUND' takes the same value
-# as in the next even numbered year
+# split the values in "EMP_STATUS_WK" into the relevant survey round (first digit/two digits)
+# and the relevant job number (last two digits)
+is_job = status >= 100
+round_jobs = np.where(is_job, np.trunc(status / 100), np.nan)
+job_number = np.where(is_job, status % 10, np.nan)
 
-cond = (df["SURVEY_YEAR"] > 1994) & (df["SURVEY_YEAR"] % 2).astype(bool)
-df.loc[cond, "SURVEY_ROUND"] = (((df["SURVEY_YEAR"] + 1) - 1994) / 2 + 16).astype(int)
+# The calendar covers all survey years and all survey rounds of the jobs.
+first_round = min(survey_year.min() - 1978, 1)
+last_round = int(max(survey_year.max() - 1978, np.nanmax(round_jobs, initial=1)))
+calendar = get_survey_calendar(first_round, last_round)
 
-df["SURVEY_ROUND"] = pd.Series(df["SURVEY_ROUND"], dtype="Int64")
+# construct a variable that displays which survey round took place in a given year
+# if there was any (, e. g. 1979 = survey round #1). For all odd numbered years after 1994,
+# 'SURVEY_ROUND' takes the same value as in the next even numbered year
+survey_round = calendar.index.to_numpy()[np.searchsorted(calendar.to_numpy(), survey_year)]
 
-# split the values in "EMP_STATUS_WK" into the relevant survey round (first digit/two digits)
-# and the relevant job number (last two digits)
 # based on the relevant survey round, determine the shift of the occjob_mod variables
 # that is necessary so that the job choice in a given year uses the jobs
 # from the survey year that correspond to the relevant survey round
+job_year = np.full(status.shape, np.nan)
+job_year[is_job] = calendar.to_numpy()[round_jobs[is_job].astype(int) - first_round]
 
-for week_num in [1, 7, 13, 14, 20, 26, 40, 46, 52]:
-    df["JOB_CHOICE_WK_" + repr(week_num)] = np.nan
-    df["WAGE_WK_" + repr(week_num)] = np.nan
-
-    cond = df["EMP_STATUS_WK_" + repr(week_num)] >= 100
-    df.loc[cond, "ROUND_JOBS_WK_" + repr(week_num)] = (
-        df.loc[cond, "EMP_STATUS_WK_" + repr(week_num)] / 100
-    ).astype(int)
-    df.loc[cond, "JOB_NUMBER_WK_" + repr(week_num)] = (
-        df.loc[cond, "EMP_STATUS_WK_" + repr(week_num)] % 10
-    )
-
-    df["REQUIRED_SHIFT_WK_" + repr(week_num)] = np.nan
-
-    cond = (df["SURVEY_ROUND"] <= 16) & (df["ROUND_JOBS_WK_" + repr(week_num)] <= 16)
-    df.loc[cond, "REQUIRED_SHIFT_WK_" + repr(week_num)] = (
-        df["ROUND_JOBS_WK_" + repr(week_num)] - df["SURVEY_ROUND"]
-    )
-
-    cond = (df["SURVEY_ROUND"] <= 16) & (df["ROUND_JOBS_WK_" + repr(week_num)] > 16)
-    df.loc[cond, "REQUIRED_SHIFT_WK_" + repr(week_num)] = (
-        df["ROUND_JOBS_WK_" + repr(week_num)] - 16
-    ) * 2 + (16 - df["SURVEY_ROUND"])
+# For survey rounds after 1994, the jobs of the rounds before 1994 are also assigned to every
+# second year counting back from 1994.
+cond = (survey_round[:, None] > 16) & (round_jobs < 16)
+job_year[cond] = (round_jobs[cond] - 16) * 2 + 1994
 
-    cond = (df["SURVEY_ROUND"] > 16) & (df["SURVEY_YEAR"] % 2).astype(bool)
-    df.loc[cond, "REQUIRED_SHIFT_WK_" + repr(week_num)] = (
-        df["ROUND_JOBS_WK_" + repr(week_num)] - df["SURVEY_ROUND"]
-    ) * 2 + 1
+required_shift = job_year - survey_year[:, None]
 
-    cond = (df["SURVEY_ROUND"] > 16) & ~(df["SURVEY_YEAR"] % 2).astype(bool)
-    df.loc[cond, "REQUIRED_SHIFT_WK_" + repr(week_num)] = (
-        df["ROUND_JOBS_WK_" + repr(week_num)] - df["SURVEY_ROUND"]
-    ) * 2
+columns = dict()
+columns["SURVEY_ROUND"] = pd.array(survey_round, dtype="Int64")
+for num, week_num in enumerate(weeks):
+    columns["JOB_CHOICE_WK_" + repr(week_num)] = np.nan
+    columns["WAGE_WK_" + repr(week_num)] = np.nan
+    columns["ROUND_JOBS_WK_" + repr(week_num)] = round_jobs[:, num]
+    columns["JOB_NUMBER_WK_" + repr(week_num)] = job_number[:, num]
+    columns["REQUIRED_SHIFT_WK_" + repr(week_num)] = required_shift[:, num]
+    columns["JOB_YEAR_WK_" + repr(week_num)] = job_year[:, num]
 
-    df["JOB_YEAR_WK_" + repr(week_num)] = (
-        df["SURVEY_YEAR"] + df["REQUIRED_SHIFT_WK_" + repr(week_num)]
-    )
+df = pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
 
-df_ext = pd.DataFrame(df.groupby(df["IDENTIFIER"]).apply(lambda x: data_shift(x)))
+df_ext = data_shift_vectorized(df)
 
-df_ext.to_pickle(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/jobs_with_occ_codes.pkl"
+store_dataset(
+    df_ext,
+    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/jobs_with_occ_codes.parquet",
 )
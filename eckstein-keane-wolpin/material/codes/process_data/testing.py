@@ -5,14 +5,31 @@ import bulwark.checks as ck
 import numpy as np
 import pandas as pd
 
+from clsWeeklyActivity import WeeklyActivityCls
+from functions_extended_clean import CHOICE_DTYPE
 from functions_extended_clean import clean_missing_wages
+from functions_extended_clean import clean_missing_wages_vectorized
 from functions_extended_clean import create_wages
+from functions_extended_clean import create_wages_vectorized
+from functions_extended_clean import get_occ_choices_vectorized
 from functions_extended_clean import get_occ_hours
+from functions_extended_clean import get_occ_hours_vectorized
 from functions_extended_clean import weeks_hours_worked
+from functions_extended_clean import weeks_hours_worked_vectorized
+from functions_occupation_lookup import get_occupation_lookup
 from functions_prelim_adjust import adjust_hgc_12_for_ged
+from functions_prelim_adjust import adjust_hgc_12_for_ged_vectorized
+from functions_prelim_adjust import apply_corrections
 from functions_prelim_adjust import data_shift
+from functions_prelim_adjust import data_shift_vectorized
+from functions_prelim_adjust import extend_df
+from functions_prelim_adjust import extend_df_vectorized
+from functions_prelim_adjust import get_survey_calendar
+from functions_prelim_adjust import interpolate_grades
 from functions_prelim_adjust import months_attended_school
+from functions_prelim_adjust import months_attended_school_vectorized
 from functions_prelim_adjust import simple_two_grade_jump
+from sharding import apply_by_agent
 
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
@@ -40,6 +57,17 @@ mock_df = adjust_hgc_12_for_ged(test_df)
 
 np.testing.assert_array_equal(mock_df["HGC"], [9, 9, 9, 10, 11])
 
+test_df = pd.DataFrame(
+    {
+        "IDENTIFIER": [1, 1, 1, 1, 2, 2, 2],
+        "HGC": [9, np.nan, 12, 13, 10, 12, 13],
+        "WHICH_OF_HS_OR_GED": [np.nan, np.nan, 2, np.nan, np.nan, 1, np.nan],
+    }
+)
+mock_df = adjust_hgc_12_for_ged_vectorized(test_df)
+
+np.testing.assert_array_equal(mock_df["HGC"], [9, np.nan, 9, 10, 10, 12, 13])
+
 col = [
     "ENROLLED_SCHOOL_" + month
     for month in [
@@ -66,6 +94,14 @@ mock_df = months_attended_school(test_df)
 
 np.testing.assert_array_equal(mock_df["MONTHS_ATTENDED_SCHOOL"], [9, 8, 3])
 
+mock_df = months_attended_school_vectorized(test_df.assign(IDENTIFIER=[0, 0, 0]))
+
+np.testing.assert_array_equal(mock_df["MONTHS_ATTENDED_SCHOOL"], [9, 8, 3])
+
+mock_df = months_attended_school_vectorized(test_df.assign(IDENTIFIER=[0, 0, 1]))
+
+np.testing.assert_array_equal(mock_df["MONTHS_ATTENDED_SCHOOL"], [9, 3, 3])
+
 # Test get_occ_hours()
 test_df = pd.DataFrame(
     {
@@ -94,6 +130,57 @@ mock_df = get_occ_hours(test_df)
 
 np.testing.assert_array_equal(mock_df["WHITE_COLLAR_HOURS"], [127.3, 124.5])
 np.testing.assert_array_equal(mock_df["BLUE_COLLAR_HOURS"], [113.5, 0])
+
+mock_df = get_occ_hours_vectorized(test_df.assign(IDENTIFIER=0))
+
+np.testing.assert_array_equal(mock_df["WHITE_COLLAR_HOURS"], [127.3, 124.5])
+np.testing.assert_array_equal(mock_df["BLUE_COLLAR_HOURS"], [113.5, 0])
+
+# The weekly occupations are stored as categoricals during the data cleaning
+col = [col for col in test_df if col.startswith("OCC_JC_WK_")]
+mock_df = get_occ_hours_vectorized(
+    test_df.assign(IDENTIFIER=0).astype(dict.fromkeys(col, CHOICE_DTYPE))
+)
+
+np.testing.assert_array_equal(mock_df["WHITE_COLLAR_HOURS"], [127.3, 124.5])
+np.testing.assert_array_equal(mock_df["BLUE_COLLAR_HOURS"], [113.5, 0])
+
+# Test get_occ_choices_vectorized()
+categories_df = pd.DataFrame(
+    {
+        "CPS_1970": [1, 5, 5, np.nan],
+        "CPS_2000_1": [np.nan, 1, 2, 3],
+        "CPS_2002": [10, 20, 1000, 2000],
+        "CATEGORY": ["white_collar", "blue_collar", "military", np.nan],
+    }
+)
+weeks = [1, 7, 13, 14, 20, 26, 40, 46, 52]
+test_df = pd.DataFrame(
+    {
+        **{"JOB_CHOICE_WK_" + repr(week_num): [5, 1] for week_num in weeks},
+        **{"ROUND_JOBS_WK_" + repr(week_num): [19, 19] for week_num in weeks},
+        **{"EMP_STATUS_WK_" + repr(week_num): [1, 1] for week_num in weeks},
+    }
+)
+test_df["JOB_CHOICE_WK_7"] = [1, 3]
+test_df["ROUND_JOBS_WK_7"] = [20, 20]
+test_df["JOB_CHOICE_WK_13"] = [1000, 10000]
+test_df["ROUND_JOBS_WK_13"] = [21, 21]
+test_df["JOB_CHOICE_WK_14"] = [np.nan, 2000]
+test_df["ROUND_JOBS_WK_14"] = [21, np.nan]
+test_df["EMP_STATUS_WK_52"] = [7, 2]
+mock_df = get_occ_choices_vectorized(test_df, get_occupation_lookup(categories_df))
+
+col = ["OCC_JC_WK_" + repr(week_num) for week_num in [1, 7, 13, 14, 52]]
+np.testing.assert_array_equal(
+    mock_df.loc[0, col].fillna("missing"),
+    ["military", "blue_collar", "military", "missing", "military"],
+)
+np.testing.assert_array_equal(
+    mock_df.loc[1, col].fillna("missing"),
+    ["white_collar", "missing", "missing", "missing", "white_collar"],
+)
+
 test_df = pd.DataFrame(
     {
         "EMP_STATUS_WK_1": [0, 103],
@@ -123,6 +210,15 @@ np.testing.assert_array_equal(mock_df["WORKED_WEEKS"], [7, 3])
 np.testing.assert_array_equal(mock_df["WORKED_WEEKS_MILITARY"], [2, 1])
 np.testing.assert_array_equal(mock_df["EMP_NONMISSING_WEEKS"], [8, 3])
 
+test_df = test_df.assign(IDENTIFIER=0, SURVEY_YEAR=[1980, 1981])
+mock_df = weeks_hours_worked_vectorized(test_df, WeeklyActivityCls(test_df))
+
+np.testing.assert_array_equal(mock_df["WORKED_WEEKS"], [7, 3])
+np.testing.assert_array_equal(mock_df["WORKED_WEEKS_MILITARY"], [2, 1])
+np.testing.assert_array_equal(mock_df["EMP_NONMISSING_WEEKS"], [8, 3])
+np.testing.assert_array_equal(mock_df["NECESSARY_WEEKS_WORKED"], [4, 1])
+np.testing.assert_array_equal(mock_df["SUM_MAX_HOURS"], [190, 109])
+
 
 test_df = pd.DataFrame(
     {
@@ -151,6 +247,10 @@ mock_df = clean_missing_wages(test_df)
 
 np.testing.assert_array_equal(mock_df["MISSPECIFIED_EMP_STATUS"], [3, 1])
 
+mock_df = clean_missing_wages_vectorized(test_df.assign(IDENTIFIER=0))
+
+np.testing.assert_array_equal(mock_df["MISSPECIFIED_EMP_STATUS"], [3, 1])
+
 test_df = pd.DataFrame(
     {
         "CHOICE": ["blue_collar", "white_collar", "white_collar"],
@@ -198,6 +298,10 @@ mock_df = create_wages(test_df)
 
 np.testing.assert_array_equal(mock_df["INCOME"], [40000, np.nan, 20000])
 
+mock_df = create_wages_vectorized(test_df.assign(IDENTIFIER=0))
+
+np.testing.assert_array_equal(mock_df["INCOME"], [40000, np.nan, 20000])
+
 col_list = ["JOB_NUMBER_WK_" + repr(week) for week in [1, 7, 13, 14, 20, 26, 40, 46, 52]]
 col_list_2 = ["JOB_YEAR_WK_" + repr(week) for week in [1, 7, 13, 14, 20, 26, 40, 46, 52]]
 col_list.extend(col_list_2)
@@ -245,6 +349,69 @@ np.testing.assert_array_equal(
     mock_df.loc[(1981), wage_col], [20001, 10001, np.nan, 30002, 50003, 10003, np.nan, 20004, 10004]
 )
 
+# The vectorized version for the whole panel has to reproduce the results of data_shift
+test_df["IDENTIFIER"] = [0, 0, 0, 0]
+mock_df_vectorized = data_shift_vectorized(test_df)
+pd.testing.assert_frame_equal(mock_df_vectorized.droplevel("IDENTIFIER"), mock_df)
+
+calendar = get_survey_calendar(-1, 18)
+
+np.testing.assert_array_equal(calendar.loc[[-1, 1, 16, 17, 18]], [1977, 1979, 1994, 1996, 1998])
+
+test_df = pd.DataFrame(
+    {
+        "IDENTIFIER": [1, 1, 1, 2, 2, 2],
+        "AGE": [17, 18, 25, 14, 15, 25],
+        "SURVEY_YEAR": [1979, 1980, 1987, 1978, 1979, 1989],
+        "HGC": [10, 11, 12, 8, 9, 16],
+    }
+)
+mock_df = extend_df_vectorized(test_df)
+
+np.testing.assert_array_equal(mock_df["AGE"], [15, 16, 17, 18, 25, 14, 15, 16, 17, 25])
+np.testing.assert_array_equal(
+    mock_df["SURVEY_YEAR"], [1977, 1978, 1979, 1980, 1987, 1978, 1979, 1980, 1981, 1989]
+)
+pd.testing.assert_frame_equal(
+    mock_df, test_df.groupby("IDENTIFIER").apply(extend_df).reset_index(drop=True)
+)
+
+test_df = pd.DataFrame(
+    {
+        "IDENTIFIER": [1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2],
+        "HGC": [10, np.nan, 12, np.nan, 12, np.nan, np.nan, 12, np.nan, np.nan, 16],
+    }
+)
+mock_df = interpolate_grades(test_df, "HGC")
+
+np.testing.assert_array_equal(mock_df, [10, 11, 12, 12, 12, np.nan, np.nan, 12, np.nan, np.nan, 16])
+
+test_df = pd.DataFrame(
+    {
+        "IDENTIFIER": [1, 1, 1, 2, 2, 2],
+        "AGE": [16, 17, 18, 16, 17, 18],
+        "SURVEY_YEAR": [1978, 1979, 1980, 1977, 1978, 1979],
+        "HGC": [9, 11, 12, 10, 12, 13],
+        "JOB_1": [26, 100, 26, 26, np.nan, 26],
+    }
+)
+corrections = pd.DataFrame(
+    {
+        "IDENTIFIER": [1, 1, 2, 2],
+        "VARIABLE": ["AGE", np.nan, "SURVEY_YEAR", "SURVEY_YEAR"],
+        "LOWER": [17, np.nan, 1978, np.nan],
+        "UPPER": [18, np.nan, np.nan, 1978],
+        "COLUMN": ["HGC", "JOB_1", "HGC", "HGC"],
+        "CURRENT_VALUE": [np.nan, 26, np.nan, 11],
+        "OPERATION": ["add", "replace", "add", "replace"],
+        "VALUE": [-1, 385, -1, 10],
+    }
+)
+mock_df = apply_corrections(test_df, corrections)
+
+np.testing.assert_array_equal(mock_df["HGC"], [9, 10, 11, 10, 10, 12])
+np.testing.assert_array_equal(mock_df["JOB_1"], [385, 100, 385, 26, np.nan, 26])
+
 test_df = pd.DataFrame(
     {"HGC": [12, 14, 14, 15, 17, 17], "MONTHS_ATTENDED_SCHOOL": [9, 9, 7, 7, 0, 10]}
 )
@@ -252,6 +419,13 @@ mock_df = simple_two_grade_jump(test_df)
 
 np.testing.assert_array_equal(mock_df["HGC"], [12, 13, 14, 15, 17, 17])
 
+# The agents are transformed in shards in a pool of processes, the results have to be identical
+test_df["IDENTIFIER"] = [1, 1, 1, 2, 2, 3]
+pd.testing.assert_frame_equal(
+    apply_by_agent(test_df, simple_two_grade_jump, max_workers=2),
+    test_df.groupby(test_df["IDENTIFIER"]).apply(simple_two_grade_jump),
+)
+
 df = pd.read_pickle(
     f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/final/ekw_ext_all_vars.pkl"
 )
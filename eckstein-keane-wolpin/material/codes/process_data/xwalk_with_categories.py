@@ -3,6 +3,11 @@
 
 """This module creates an extended version of 'occ1990_xwalk.xls' where job categories
  (white-collar or blue-collar) are assigned to every occupation code regardless of coding system.
+
+In addition, the category of each occupation code is stored as an array for each set of
+occupation codes, which the later stages memory-map instead of processing the crosswalk again.
+A hash of the crosswalk and its processing is stored with the array, the later stages compare it
+with their inputs before using the array.
 """
 
 import os
@@ -11,11 +16,27 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from functions_occupation_lookup import get_occupation_lookup
+from functions_occupation_lookup import get_occupation_lookup_key
+from functions_occupation_lookup import store_occupation_lookup
+
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
-crosswalk = pd.read_excel(
+XWALK_FILE = (
     f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/occ_crosswalks/occ1990_xwalk.xls"
 )
+
+
+def get_conflicting_codes(crosswalk):
+    """This function returns the OCC1990 codes that include both a white-collar and a blue-collar
+    CPS1970 code."""
+    is_white = crosswalk["category_aux"].eq("white_collar").groupby(crosswalk["OCC1990"]).any()
+    is_blue = crosswalk["category_aux"].eq("blue_collar").groupby(crosswalk["OCC1990"]).any()
+
+    return list(is_white.index[is_white & is_blue])
+
+
+crosswalk = pd.read_excel(XWALK_FILE)
 crosswalk = crosswalk.iloc[:, [0, 1, 4, 7, 8]]
 crosswalk.columns = ["OCC1990", "DESCRIPTION", "CPS_1970", "CPS_2000_1", "CPS_2000_5"]
 # Delete headings in file
@@ -59,18 +80,7 @@ row = [np.nan, "Current member of armed forces", 590, np.nan, np.nan, "military"
 # to the whole corresponding OCC1990 code would need to be revised for such codes.
 # As "aux_list" shows, there are indeed 5 such OCC1990 codes which are fixed in the cell below.
 
-aux_dict = dict()
-
-for num in crosswalk["OCC1990"].unique():
-    aux_dict[num] = list(crosswalk["category_aux"][crosswalk["OCC1990"] == num])
-
-aux_list = []
-
-for key, value in aux_dict.items():
-    if ("white_collar" in aux_dict[key]) and ("blue_collar" in aux_dict[key]):
-        aux_list += [key]
-    else:
-        continue
+aux_list = get_conflicting_codes(crosswalk)
 
 # OCC1990 = 89
 crosswalk.loc[(crosswalk["CPS_1970"] == 924), "CATEGORY"] = "blue_collar"
@@ -218,6 +228,13 @@ crosswalk["CATEGORY"].loc[crosswalk["CPS_2000_1"] == 933] = "white_collar"
 # by adding a trailing 0 to the 2000 codes
 crosswalk["CPS_2002"] = crosswalk["CPS_2000_1"].copy() * 10
 
-crosswalk.drop(columns=["category_aux"]).to_pickle(
+crosswalk = crosswalk.drop(columns=["category_aux"])
+crosswalk.to_pickle(
     f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/categorized_xwalk.pkl"
 )
+
+store_occupation_lookup(
+    get_occupation_lookup(crosswalk),
+    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/interim/categorized_xwalk.npy",
+    get_occupation_lookup_key(XWALK_FILE),
+)
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+from dct_mappings import get_cached_mappings
 from dct_mappings import get_mappings
 from special_treatments import aggregate_birth_information
 from special_treatments import aggregate_highest_degree_received
@@ -12,9 +13,14 @@ from special_treatments import cleaning_highest_grade_attended
 from special_treatments import create_is_interviewed
 from special_treatments import standarize_employer_information
 from special_treatments import standarize_job_information
+from storage import load_dataset
+from storage import store_dataset
+from storage import store_partition
 
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
+SOURCE_FILE = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original_extended.csv"
+
 # We maintain this list to contain all variables that are processed for the panel. This is checked
 # in the testing method.
 TIME_CONSTANT = []
@@ -76,6 +82,24 @@ for start in ["JOB_"]:
 for month in months:
     DERIVED_VARS += ["ENROLLED_SCHOOL_" + month]
 
+# We store the original data with compact integer types. The types are determined by the range of
+# realizations of each variable. All variables that do not start with any of the prefixes below
+# are stored as int32.
+COMPACT_DTYPES = dict()
+
+COMPACT_DTYPES["int8"] = []
+COMPACT_DTYPES["int8"] += ["RACE", "GENDER", "SAMPLE_ID", "ASVAB_", "AFQT_1", "CHARGE_ILL_ACT_"]
+COMPACT_DTYPES["int8"] += ["CONVICTION_", "CORRECTIONAL INSTITUTION_", "NUMBER_OF_SIBLINGS"]
+COMPACT_DTYPES["int8"] += ["MOTHER_HGC", "HH_STRUCTURE_AGE_14", "ENROLLED_SCHOOL_", "MONTH_"]
+COMPACT_DTYPES["int8"] += ["HIGHEST_DEGREE_RECEIVED_", "HIGHEST_GRADE_ATTENDED", "REVISED_"]
+COMPACT_DTYPES["int8"] += ["UNREVISED_", "OBTAINED_HS_OR_EQUIV", "WHICH_OF_HS_OR_GED"]
+COMPACT_DTYPES["int8"] += ["AMOUNT_OF_WORK_LIMITED", "KIND_OF_WORK_LIMITED", "TYPE_OF_RESIDENCE"]
+COMPACT_DTYPES["int8"] += ["MARITAL_STATUS", "REASON_NONINTERVIEW", "CPS_JOB_INDICATOR_JOB_"]
+
+COMPACT_DTYPES["int16"] = []
+COMPACT_DTYPES["int16"] += ["EMP_STATUS_WK_", "EMP_HOURS_WK_", "CPSOCC70", "OCCALL70_JOB_"]
+COMPACT_DTYPES["int16"] += ["OCCALL00_JOB_", "OCCALL02_JOB_", "YEAR_"]
+
 
 class SourceCls(object):
     """This class contains all methods that prepare the source dataset for further uses."""
@@ -88,24 +112,64 @@ class SourceCls(object):
         self.source_long = None
         self.dct = None
 
-    def read_source(self, num_agents=None):
-        """Read the original file from the NLSY INVESTIGATOR."""
+    def read_source(self, num_agents=None, use_cache=True, compact=True, engine=None):
+        """Read the original file from the NLSY INVESTIGATOR. The variable mappings are loaded
+        from the cache if the short description file and the weekly crosswalk are unchanged.
+
+        In the compact mode, only the columns that are referenced in the variable mappings are
+        read and all of them are stored as integers of the smallest suitable size. Columns with
+        missing values are stored as the corresponding nullable integers. The engine is passed on
+        to the CSV parser, note that the ``pyarrow`` engine does not support the restriction to a
+        number of agents.
+        """
+        dtypes = self._read_mappings(use_cache, compact)
+
         # Read from original data from CSV file
-        self.source_wide = pd.read_csv(
-            f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original_extended.csv",
+        source_wide = pd.read_csv(
+            SOURCE_FILE,
             nrows=num_agents,
+            usecols=None if dtypes is None else list(dtypes.keys()),
+            engine=engine,
         )
 
-        # Process variable dictionary
-        survey_years, dct = get_mappings()
+        # We cast the columns after parsing as the parser does not check for overflows and the
+        # parsing of nullable integers is considerably slower.
+        if compact:
+            source_wide = compact_source(source_wide, dtypes)
 
-        # Attach results as class attributes
-        self.survey_years = survey_years
-        self.dct = dct
+        self.source_wide = source_wide
+
+    def read_source_batches(self, batch_size, num_agents=None, use_cache=True, compact=True):
+        """Read the original file in batches of agents for the chunked construction of the panel.
+        This method is a generator that replaces the original data with the next batch and yields
+        the number of the batch. The batches are processed independently, so all steps up to the
+        storage of the panel must only use the information of each agent and must not look across
+        agents. This is checked in the testing_batches method.
+
+        The index of a batch continues the one of the previous batches, so the mapping to the
+        NLSY identifier is maintained.
+        """
+        dtypes = self._read_mappings(use_cache, compact)
+
+        with pd.read_csv(
+            SOURCE_FILE,
+            nrows=num_agents,
+            usecols=None if dtypes is None else list(dtypes.keys()),
+            chunksize=batch_size,
+        ) as reader:
+            for num, source_wide in enumerate(reader):
+                if compact:
+                    source_wide = compact_source(source_wide, dtypes)
+
+                self.source_wide = source_wide
+                self.source_long = None
+
+                yield num
 
     def add_basic_variables(self):
         """We add some basic variables that are easily constructed from the original information
-        and frequently used during finer processing of the data.
+        and frequently used during finer processing of the data. The panel might only contain a
+        batch of agents, so the special treatments must not look across agents.
         """
         # Distribute class attributes
         source_long = self.source_long
@@ -129,17 +193,42 @@ class SourceCls(object):
 
         self.source_long = source_long
 
-    def transform_wide_to_panel(self):
-        """Transform from wide to long format."""
+    def transform_wide_to_panel(self, vectorized=True):
+        """Transform from wide to long format. The vectorized reshape is the default, the original
+        implementation is kept available for validation purposes.
+        """
         # Distribute class attributes
         survey_years = self.survey_years
         source_wide = self.source_wide
         dct = self.dct
 
         # Change from the original wide format to the typical panel structure
-        self.source_long = wide_to_long(source_wide, survey_years, dct)
+        if vectorized:
+            self.source_long = wide_to_long_vectorized(source_wide, survey_years, dct)
+        else:
+            self.source_long = wide_to_long(source_wide, survey_years, dct)
         self._set_missing_values()
 
+    def _read_mappings(self, use_cache, compact):
+        """This method loads the variable mappings. The variable mappings are loaded from the cache
+        if the short description file and the weekly crosswalk are unchanged. In the compact mode,
+        it returns the types of the columns that are referenced in the variable mappings.
+        """
+        # Process variable dictionary
+        if use_cache:
+            survey_years, dct = get_cached_mappings(
+                f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/raw/dct_mappings.json"
+            )
+        else:
+            survey_years, dct = get_mappings()
+
+        # Attach results as class attributes
+        self.survey_years = survey_years
+        self.dct = dct
+
+        if compact:
+            return get_compact_dtypes(dct)
+
     def _set_missing_values(self):
         """This method ensures a uniform setup for the treatment of missing values."""
         # Distribute class attributes
@@ -366,18 +455,44 @@ class SourceCls(object):
         varnames = TIME_CONSTANT + TIME_VARYING + DERIVED_VARS
         np.testing.assert_equal(set(source_long.columns.values), set(varnames))
 
+    def testing_batches(self, num_agents=1000, batch_size=300):
+        """This method checks that the construction of the panel in batches of agents results in
+        the same panel as the construction in a single step for the first agents.
+        """
+        source_obj = SourceCls()
+        source_obj.read_source(num_agents=num_agents)
+        source_obj.transform_wide_to_panel()
+        source_obj.add_basic_variables()
+
+        batches = []
+        batch_obj = SourceCls()
+        for _ in batch_obj.read_source_batches(batch_size, num_agents=num_agents):
+            batch_obj.transform_wide_to_panel()
+            batch_obj.add_basic_variables()
+            batches += [batch_obj.source_long]
+
+        pd.testing.assert_frame_equal(pd.concat(batches), source_obj.source_long)
+
     def store(self, fname):
         """Store the dataset for further processing."""
         # Distribute class attributes
         source_long = self.source_long
 
-        # Write out persistent storage
-        source_long.to_pickle(fname)
+        # Write out persistent storage, the format is determined by the file extension.
+        store_dataset(source_long, fname)
 
-    def load(self, fname):
-        """Store the dataset for further processing."""
+    def store_partition(self, fname, num):
+        """Store the panel of a batch of agents as a partition of the dataset."""
         # Distribute class attributes
-        self.source_long = pd.read_pickle(fname)
+        source_long = self.source_long
+
+        # Write out persistent storage, the partitions are concatenated when the dataset is loaded.
+        store_partition(source_long, fname, num)
+
+    def load(self, fname, columns=None):
+        """Load the dataset for further processing, optionally restricted to some columns."""
+        # Distribute class attributes
+        self.source_long = load_dataset(fname, columns)
 
 
 def wide_to_long(source_wide, additional_level, dct):
@@ -406,7 +521,9 @@ def wide_to_long(source_wide, additional_level, dct):
             if year not in dct[long_name].keys():
                 continue
             # Now we can simply assign the variable name to the corresponding year.
-            pd_long.loc[(slice(None), year), long_name] = source_wide[dct[long_name][year]].values
+            pd_long.loc[(slice(None), year), long_name] = _get_values(
+                source_wide[dct[long_name][year]]
+            )
 
     # For some variables we do not have any missing values and so we can impose an integer type.
     for varname in ["IDENTIFIER", "SURVEY_YEAR", "RACE", "GENDER"]:
@@ -415,6 +532,96 @@ def wide_to_long(source_wide, additional_level, dct):
     return pd_long
 
 
+def wide_to_long_vectorized(source_wide, additional_level, dct):
+    """This function constructs the same panel as ``wide_to_long``. However, each variable is
+    first collected in a block with one row per agent and one column per year and then flattened
+    into the panel. This avoids the repeated assignments to the multi-indexed dataframe.
+    """
+    # We maintain the same index structure and thus the mapping between the index in the
+    # dataframe and the NLSY identifier.
+    caseid = [x + 1 for x in source_wide.index]
+    multi_index = pd.MultiIndex.from_product(
+        [caseid, additional_level], names=["Identifier", "Survey Year"]
+    )
+    num_agents, num_years = len(caseid), len(additional_level)
+
+    # We collect all columns first and create the dataframe in a single step at the end. The
+    # housekeeping columns are set up first to preserve the ordering of the columns.
+    columns = dict()
+    columns["IDENTIFIER"] = multi_index.get_level_values("Identifier").values
+    columns["SURVEY_YEAR"] = multi_index.get_level_values("Survey Year").values
+
+    for long_name in dct.keys():
+        # The block is initialized with missing values which simply remain for all years where
+        # the variable is not defined.
+        block = np.full((num_agents, num_years), np.nan)
+        for j, year in enumerate(additional_level):
+            if year not in dct[long_name].keys():
+                continue
+            block[:, j] = _get_values(source_wide[dct[long_name][year]])
+
+        # The rows of the block are in the same order as the agents in the index and the years
+        # vary fastest within each agent, so flattening in row-major order aligns the two.
+        columns[long_name] = block.ravel()
+
+    pd_long = pd.DataFrame(columns, index=multi_index)
+
+    # For some variables we do not have any missing values and so we can impose an integer type.
+    for varname in ["IDENTIFIER", "SURVEY_YEAR", "RACE", "GENDER"]:
+        pd_long[varname] = pd_long[varname].astype("int64")
+
+    return pd_long
+
+
+def get_compact_dtypes(dct):
+    """This function determines the type of each column in the original data that is referenced
+    in the variable mappings.
+    """
+    # We order the types by their size, so that a column that is used by several variables is
+    # stored with the largest of their types.
+    sizes = ["int8", "int16", "int32"]
+
+    dtypes = dict()
+    for long_name in dct.keys():
+        dtype = "int32"
+        for candidate in ["int8", "int16"]:
+            if long_name.startswith(tuple(COMPACT_DTYPES[candidate])):
+                dtype = candidate
+
+        for name in dct[long_name].values():
+            dtypes[name] = max(dtype, dtypes.get(name, dtype), key=sizes.index)
+
+    return dtypes
+
+
+def compact_source(source_wide, dtypes):
+    """This function casts each column of the original data to its compact integer type. Columns
+    with missing values are cast to the nullable version of the type.
+    """
+    columns = dict()
+    for name in source_wide.columns:
+        column, dtype = source_wide[name], dtypes[name]
+
+        # We need to ensure that all realizations are within the range of the compact type.
+        info = np.iinfo(dtype)
+        if column.min() < info.min or column.max() > info.max:
+            raise AssertionError(f"Realizations of {name} exceed the range of {dtype} ...")
+
+        if column.isnull().any():
+            dtype = dtype.capitalize()
+
+        columns[name] = column.astype(dtype)
+
+    return pd.DataFrame(columns, index=source_wide.index)
+
+
+def _get_values(series):
+    """This function returns the values of a column of the original data as floats. Nullable
+    integer types are supported with their missing values being translated to NaN.
+    """
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
 def cpsocc_counts(year, source_long):
     """This function returns counts for each of the bins of the variable."""
     bins = []
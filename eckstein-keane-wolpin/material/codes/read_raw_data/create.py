@@ -1,25 +1,56 @@
 #!/usr/bin/env python
-""" This script constructs the panel dataset based on the NLSY sources from the website which are in
-the wide format.
+"""This script runs the stages that construct the panel dataset based on the NLSY sources from the
+website which are in the wide format.
 """
+
 import os
 from pathlib import Path
-from clsSource import SourceCls
-
-for file in ["create_large_files", "process_original_csv"]:
-    os.system(f"python {file}.py")
 
+from pipeline import run_pipeline
+from pipeline import Stage
 
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
-if __name__ == "__main__":
-    fname = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/raw/ekw_raw.pkl"
+CODES_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/codes/read_raw_data"
+SOURCES_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources"
+OUTPUT_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data"
+PYTHON_DIR = f"{PROJECT_DIR}/python"
 
-    source_obj = SourceCls()
-    source_obj.read_source()
-    source_obj.transform_wide_to_panel()
-    source_obj.add_basic_variables()
-    source_obj.store(fname)
+SUPPLEMENTARY_FILES = []
+SUPPLEMENTARY_FILES += ["unrevised_educ_vars", "additional_educ_vars"]
+SUPPLEMENTARY_FILES += ["labor_force_status_all_weeks", "health_vars", "marital_status"]
+SUPPLEMENTARY_FILES += ["illegal_activity", "Table_13_covariates"]
 
-    source_obj.load(fname)
-    source_obj.testing()
+STAGES = []
+STAGES += [
+    Stage(
+        "create_large_files",
+        CODES_DIR,
+        [f"{SOURCES_DIR}/original-*", f"{SOURCES_DIR}/labor_force_status_all_weeks-*"],
+        [f"{SOURCES_DIR}/original.csv", f"{SOURCES_DIR}/labor_force_status_all_weeks.csv"],
+    )
+]
+STAGES += [
+    Stage(
+        "process_original_csv",
+        CODES_DIR,
+        [f"{SOURCES_DIR}/original.csv", f"{SOURCES_DIR}/original.sdf"]
+        + [f"{SOURCES_DIR}/{filename}.csv" for filename in SUPPLEMENTARY_FILES]
+        + [f"{SOURCES_DIR}/{filename}.sdf" for filename in SUPPLEMENTARY_FILES],
+        [f"{SOURCES_DIR}/original_extended.csv", f"{SOURCES_DIR}/original_extended.sdf"],
+    )
+]
+STAGES += [
+    Stage(
+        "create_panel",
+        CODES_DIR,
+        [f"{SOURCES_DIR}/original_extended.csv", f"{SOURCES_DIR}/original_extended.sdf"]
+        + [f"{SOURCES_DIR}/weekly_crosswalks/continuous_week_crosswalk_2012.pkl"]
+        + [f"{CODES_DIR}/{module}.py" for module in ["clsSource", "dct_mappings"]]
+        + [f"{CODES_DIR}/special_treatments.py", f"{PYTHON_DIR}/storage.py"],
+        [f"{OUTPUT_DIR}/raw/ekw_raw.parquet"],
+    )
+]
+
+if __name__ == "__main__":
+    run_pipeline(STAGES, f"{OUTPUT_DIR}/pipeline_state.json")
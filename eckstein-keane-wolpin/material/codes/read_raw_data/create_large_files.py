@@ -2,29 +2,77 @@
 to directly store them in our Github repo.
 """
 
+import hashlib
+import json
 import os
+import shutil
 from glob import glob
 from pathlib import Path
 
-import pandas as pd
-
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
-# create original.csv
-original_list = sorted(
-    glob(f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original-*"),
-    key=lambda x: int(x.rpartition("-")[2].partition(".")[0]),
-)
-df = pd.concat((pd.read_csv(file) for file in original_list))
-df.to_csv(f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original.csv", index=True)
-
-# create labor_force_status_all_weeks.csv
-labor_list = sorted(
-    glob(f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/labor_force_status_all_weeks-*"),
-    key=lambda x: int(x.rpartition("-")[2].partition(".")[0]),
-)
-df = pd.concat((pd.read_csv(file) for file in labor_list))
-df.to_csv(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/labor_force_status_all_weeks.csv",
-    index=True,
-)
+SOURCES_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources"
+OUTPUT_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data"
+
+CHUNK_SIZE = 2**24
+
+
+def get_checksum(fname):
+    """This function returns the checksum of a file, which is read in chunks."""
+    checksum = hashlib.sha256()
+    with open(fname, "rb") as infile:
+        for chunk in iter(lambda: infile.read(CHUNK_SIZE), b""):
+            checksum.update(chunk)
+
+    return checksum.hexdigest()
+
+
+def assemble_shards(name):
+    """This function concatenates the shards of a csv-file. The header of the first shard is kept
+    and the rows of all shards are appended byte-wise, so the combined dataset is never held in
+    memory. The file is only rebuilt if the shards changed since the last run. The checksums of
+    the shards are part of the build state in the output directory.
+    """
+    fname = f"{SOURCES_DIR}/{name}.csv"
+    fname_checksums = f"{OUTPUT_DIR}/{name}.checksums.json"
+
+    shards = sorted(
+        glob(f"{SOURCES_DIR}/{name}-*"),
+        key=lambda x: int(x.rpartition("-")[2].partition(".")[0]),
+    )
+    if not shards:
+        raise AssertionError(f"There are no shards available to create {name}.csv.")
+
+    checksums = {os.path.basename(shard): get_checksum(shard) for shard in shards}
+
+    if os.path.exists(fname) and os.path.exists(fname_checksums):
+        with open(fname_checksums) as infile:
+            if json.load(infile) == checksums:
+                return
+
+    with open(fname, "wb") as outfile:
+        for num, shard in enumerate(shards):
+            with open(shard, "rb") as infile:
+                header = infile.readline()
+                if num == 0:
+                    outfile.write(header)
+                    first_header = header
+                elif header != first_header:
+                    raise AssertionError(f"The header of {shard} differs from the first shard.")
+
+                shutil.copyfileobj(infile, outfile, CHUNK_SIZE)
+
+                # We need to make sure that the last row of a shard does not run into the first
+                # row of the next one.
+                if infile.tell() > len(header):
+                    infile.seek(-1, os.SEEK_END)
+                    if infile.read(1) != b"\n":
+                        outfile.write(b"\n")
+
+    # The checksums are only recorded once the file is complete.
+    with open(fname_checksums, "w") as outfile:
+        json.dump(checksums, outfile, indent=4)
+
+
+for name in ["original", "labor_force_status_all_weeks"]:
+    assemble_shards(name)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+""" This script constructs the panel dataset based on the NLSY sources from the website which are in
+the wide format.
+"""
+import os
+from pathlib import Path
+from clsSource import SourceCls
+
+PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
+
+
+def create_panel(fname, batch_size=None):
+    """This function constructs the panel dataset. If a batch size is specified, the panel is
+    constructed in batches of agents which are stored as partitions of the dataset, e.g. to bound
+    the memory that is required for larger extracts. The dataset is identical to the one that is
+    constructed in a single step once it is loaded.
+    """
+    source_obj = SourceCls()
+    if batch_size is None:
+        source_obj.read_source()
+        source_obj.transform_wide_to_panel()
+        source_obj.add_basic_variables()
+        source_obj.store(fname)
+    else:
+        for num in source_obj.read_source_batches(batch_size):
+            source_obj.transform_wide_to_panel()
+            source_obj.add_basic_variables()
+            source_obj.store_partition(fname, num)
+
+    return source_obj
+
+
+if __name__ == "__main__":
+    fname = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/raw/ekw_raw.parquet"
+
+    # The batch size of the stage is set in the environment. It does not affect the dataset, so it
+    # is not part of the inputs of the stage.
+    batch_size = os.environ.get("PANEL_BATCH_SIZE")
+
+    source_obj = create_panel(fname, None if batch_size is None else int(batch_size))
+
+    source_obj.load(fname)
+    source_obj.testing()
+    source_obj.testing_batches()
@@ -1,10 +1,18 @@
 """ This module processes the Short Description File to get the yearly variable names.
 """
+from collections import namedtuple
+import hashlib
+import json
+import os
 import shlex
 
-import numpy as np
 import pandas as pd
 
+# These are the only inputs for the construction of the mappings. Any change in their content
+# invalidates the mappings that are cached on disk.
+SDF_FILE = "../../sources/original_extended.sdf"
+WEEKLY_CROSSWALK_FILE = "../../sources/weekly_crosswalks/continuous_week_crosswalk_2012.pkl"
+
 
 def get_mappings():
     """We process the mappings for two separate cases. (1) Variables that vary by year,
@@ -15,21 +23,205 @@ def get_mappings():
     # the initial interview.
     years = range(1978, 2013)
 
+    # We parse the short description file only once and resolve all names through its index.
+    sdf = SdfIndex(SDF_FILE)
+
     # time-constant variables
     dct_full = dict()
 
-    dct_full.update(process_time_constant(years))
+    dct_full.update(process_time_constant(years, sdf))
 
-    dct_full.update(process_school_enrollment_monthly())
-    dct_full.update(process_highest_degree_received())
-    dct_full.update(process_multiple_each_year())
-    dct_full.update(process_single_each_year())
+    dct_full.update(process_school_enrollment_monthly(sdf))
+    dct_full.update(process_highest_degree_received(sdf))
+    dct_full.update(process_multiple_each_year(sdf))
+    dct_full.update(process_single_each_year(sdf))
 
     # Finishing
     return years, dct_full
 
 
-def process_time_constant(years):
+def get_cached_mappings(fname):
+    """We load the mappings from the cache file if it was created from the current inputs.
+    Otherwise, we construct the mappings from scratch and update the cache file.
+    """
+    key = get_mappings_hash()
+
+    if os.path.exists(fname):
+        with open(fname, "r") as infile:
+            cache = json.load(infile)
+
+        if cache["hash"] == key:
+            years = range(*cache["years"])
+            dct = dict()
+            for label, names in cache["dct"].items():
+                dct[label] = {int(year): name for year, name in names.items()}
+
+            return years, dct
+
+    years, dct = get_mappings()
+
+    # The years are stored as integers as JSON only allows for strings as keys.
+    cache = dict()
+    cache["hash"] = key
+    cache["years"] = [years.start, years.stop]
+    cache["dct"] = dict()
+    for label, names in dct.items():
+        cache["dct"][label] = {str(year): name for year, name in names.items()}
+
+    with open(fname, "w") as outfile:
+        json.dump(cache, outfile, separators=(",", ":"))
+
+    return years, dct
+
+
+def get_mappings_hash():
+    """This function returns a hash of the content of all inputs to the mappings. We include this
+    module as well, so that changes to the processing also trigger a reconstruction.
+    """
+    sha = hashlib.sha256()
+    for fname in [SDF_FILE, WEEKLY_CROSSWALK_FILE, __file__]:
+        with open(fname, "rb") as infile:
+            sha.update(infile.read())
+
+    return sha.hexdigest()
+
+
+# Each line of the short description file is stored as a record with the reference number,
+# the survey year, and the whitespace-separated tokens of the full line.
+SdfRecord = namedtuple("SdfRecord", ["name", "year", "tokens"])
+
+
+class SdfIndex(object):
+    """This class parses the short description file once and then resolves the variable names
+    through an inverted index from tokens to line numbers instead of rescanning the file for
+    each request.
+    """
+
+    def __init__(self, fname):
+
+        with open(fname, "r") as infile:
+            self.lines = infile.readlines()
+
+        # Class attributes
+        self.records = []
+        self.token_index = dict()
+        self._cache = dict()
+
+        for num, line in enumerate(self.lines):
+            tokens = line.split()
+
+            name, year = None, None
+            if len(tokens) > 0:
+                name = tokens[0].replace(".", "")
+            if len(tokens) > 1:
+                year = tokens[1]
+
+            self.records += [SdfRecord(name, year, tokens)]
+
+            for token in set(tokens):
+                if token not in self.token_index.keys():
+                    self.token_index[token] = []
+                self.token_index[token] += [num]
+
+    def get_name(self, substrings):
+        """Search through the file by substrings"""
+        # We allow to pass in a string or a list of strings that are checked in the variable
+        # descriptions.
+        if isinstance(substrings, str):
+            substrings = [substrings]
+
+        for num in self._search(substrings):
+            # This special treatment is only required due to the string that identifiers RACE.
+            line = self.lines[num].replace("'", "")
+            list_ = shlex.split(line)
+            name = list_[0].replace(".", "")
+
+            return name
+
+        raise AssertionError("Substrings not found ...")
+
+    def get_year_name(self, substrings):
+        """Search through the file by substrings."""
+        # We allow to pass in a string or a list of strings that are checked in the variable
+        # descriptions.
+        if isinstance(substrings, str):
+            substrings = [substrings]
+
+        container = dict()
+        for num in self._search(substrings):
+            record = self.records[num]
+            container[int(record.year)] = record.name
+
+        return container
+
+    def get_lines(self, substrings):
+        """Return all lines that contain the substrings in the order of the file."""
+        if isinstance(substrings, str):
+            substrings = [substrings]
+
+        return [self.lines[num] for num in self._search(substrings)]
+
+    def _search(self, substrings):
+        """Return the numbers of all lines that contain all substrings in the order of the file.
+        The inverted index only narrows down the candidate lines, the final check is the same
+        substring check as for a full scan of the file.
+        """
+        candidates = None
+        for substring in substrings:
+            rslt = self._get_candidates(substring)
+            if candidates is None:
+                candidates = rslt
+            else:
+                candidates = candidates & rslt
+
+        if candidates is None:
+            candidates = set(range(len(self.lines)))
+
+        nums = []
+        for num in sorted(candidates):
+            line = self.lines[num]
+            if all([substring in line for substring in substrings]):
+                nums += [num]
+
+        return nums
+
+    def _get_candidates(self, substring):
+        """Return the numbers of all lines that can possibly contain the substring. Each token of
+        the substring that is surrounded by whitespace in the substring needs to be a token of the
+        line as well. The first and last token might only be the end or the beginning of a token
+        in the line.
+        """
+        if substring in self._cache.keys():
+            return self._cache[substring]
+
+        parts = substring.split()
+
+        candidates = set(range(len(self.lines)))
+        for i, part in enumerate(parts):
+            is_bounded_left = i > 0 or substring[0].isspace()
+            is_bounded_right = i < len(parts) - 1 or substring[-1].isspace()
+
+            if is_bounded_left and is_bounded_right:
+                tokens = [part]
+            elif is_bounded_left:
+                tokens = [token for token in self.token_index.keys() if token.startswith(part)]
+            elif is_bounded_right:
+                tokens = [token for token in self.token_index.keys() if token.endswith(part)]
+            else:
+                tokens = [token for token in self.token_index.keys() if part in token]
+
+            lines = set()
+            for token in tokens:
+                lines.update(self.token_index.get(token, []))
+
+            candidates = candidates & lines
+
+        self._cache[substring] = candidates
+
+        return candidates
+
+
+def process_time_constant(years, sdf):
     """We need to process some time-constant variables."""
 
     dct_constant = dict()
@@ -37,100 +229,98 @@ def process_time_constant(years):
     dct_constant["RACE"] = dict()
     substrings = "RACIAL/ETHNIC COHORT FROM SCREENER"
     for year in years:
-        dct_constant["RACE"][year] = get_name(substrings)
+        dct_constant["RACE"][year] = sdf.get_name(substrings)
 
     dct_constant["IDENTIFIER"] = dict()
     substrings = "CASEID"
     for year in years:
-        dct_constant["IDENTIFIER"][year] = get_name(substrings)
+        dct_constant["IDENTIFIER"][year] = sdf.get_name(substrings)
 
     dct_constant["SAMPLE_ID"] = dict()
     substrings = "SAMPLE_ID"
     for year in years:
-        dct_constant["SAMPLE_ID"][year] = get_name(substrings)
+        dct_constant["SAMPLE_ID"][year] = sdf.get_name(substrings)
 
     dct_constant["GENDER"] = dict()
     substrings = "SEX OF R"
     for year in years:
-        dct_constant["GENDER"][year] = get_name(substrings)
+        dct_constant["GENDER"][year] = sdf.get_name(substrings)
 
     dct_constant["ASVAB_ARITHMETIC_REASONING"] = dict()
     substrings = "PROFILES, ASVAB VOCATIONAL TEST - SECTION 2-ARITHMETIC REASONING"
     for year in years:
-        dct_constant["ASVAB_ARITHMETIC_REASONING"][year] = get_name(substrings)
+        dct_constant["ASVAB_ARITHMETIC_REASONING"][year] = sdf.get_name(substrings)
 
     dct_constant["ASVAB_WORD_KNOWLEDGE"] = dict()
     substrings = "PROFILES, ASVAB VOCATIONAL TEST - SECTION 3-WORD KNOWLEDGE"
     for year in years:
-        dct_constant["ASVAB_WORD_KNOWLEDGE"][year] = get_name(substrings)
+        dct_constant["ASVAB_WORD_KNOWLEDGE"][year] = sdf.get_name(substrings)
 
     dct_constant["ASVAB_PARAGRAPH_COMPREHENSION"] = dict()
     substrings = "PROFILES, ASVAB VOCATIONAL TEST - SECTION 4-PARAGRAPH COMP"
     for year in years:
-        dct_constant["ASVAB_PARAGRAPH_COMPREHENSION"][year] = get_name(substrings)
+        dct_constant["ASVAB_PARAGRAPH_COMPREHENSION"][year] = sdf.get_name(substrings)
 
     dct_constant["ASVAB_NUMERICAL_OPERATIONS"] = dict()
     substrings = "PROFILES, ASVAB VOCATIONAL TEST - SECTION 5-NUMERICAL OPERATIONS"
     for year in years:
-        dct_constant["ASVAB_NUMERICAL_OPERATIONS"][year] = get_name(substrings)
+        dct_constant["ASVAB_NUMERICAL_OPERATIONS"][year] = sdf.get_name(substrings)
 
     dct_constant["ASVAB_ALTERED_TESTING"] = dict()
     substrings = "PROFILES, ASVAB VOCATIONAL TEST - NORMAL/ALTERED TESTING"
     for year in years:
-        dct_constant["ASVAB_ALTERED_TESTING"][year] = get_name(substrings)
+        dct_constant["ASVAB_ALTERED_TESTING"][year] = sdf.get_name(substrings)
 
     dct_constant["AFQT_1"] = dict()
     substrings = "PROFILES, ARMED FORCES QUALIFICATION TEST (AFQT) PERCENTILE SCORE - 1980"
     for year in years:
-        dct_constant["AFQT_1"][year] = get_name(substrings)
+        dct_constant["AFQT_1"][year] = sdf.get_name(substrings)
 
     dct_constant["CHARGE_ILL_ACT_1980"] = dict()
     substrings = "EVER CHARGED WITH ILLEGAL ACTIVITY?"
     for year in years:
-        dct_constant["CHARGE_ILL_ACT_1980"][year] = get_name(substrings)
+        dct_constant["CHARGE_ILL_ACT_1980"][year] = sdf.get_name(substrings)
 
     dct_constant["CONVICTION_1980"] = dict()
     substrings = "EVER CONVICTED ON ILLEGAL ACTIVITY CHARGES"
     for year in years:
-        dct_constant["CONVICTION_1980"][year] = get_name(substrings)
+        dct_constant["CONVICTION_1980"][year] = sdf.get_name(substrings)
 
     dct_constant["CORRECTIONAL INSTITUTION_1980"] = dict()
     substrings = "EVER BEEN SENTENCED TO ANY TYPE OF CORRECTIONAL INSTITUTION"
     for year in years:
-        dct_constant["CORRECTIONAL INSTITUTION_1980"][year] = get_name(substrings)
+        dct_constant["CORRECTIONAL INSTITUTION_1980"][year] = sdf.get_name(substrings)
 
     dct_constant["NUMBER_OF_SIBLINGS"] = dict()
     substrings = "NUMBER OF SIBLINGS"
     for year in years:
-        dct_constant["NUMBER_OF_SIBLINGS"][year] = get_name(substrings)
+        dct_constant["NUMBER_OF_SIBLINGS"][year] = sdf.get_name(substrings)
 
     dct_constant["FAMILY_INCOME"] = dict()
     substrings = "TOTAL NET FAMILY INCOME IN PAST CALENDAR YEAR"
     for year in years:
-        dct_constant["FAMILY_INCOME"][year] = get_name(substrings)
+        dct_constant["FAMILY_INCOME"][year] = sdf.get_name(substrings)
 
     dct_constant["MOTHER_HGC"] = dict()
     substrings = "HIGHEST GRADE COMPLETED BY R'S MOTHER"
     for year in years:
-        dct_constant["MOTHER_HGC"][year] = get_name(substrings)
+        dct_constant["MOTHER_HGC"][year] = sdf.get_name(substrings)
 
     dct_constant["HH_STRUCTURE_AGE_14"] = dict()
     substrings = "WITH WHOM DID R LIVE AT AGE 14?"
     for year in years:
-        dct_constant["HH_STRUCTURE_AGE_14"][year] = get_name(substrings)
+        dct_constant["HH_STRUCTURE_AGE_14"][year] = sdf.get_name(substrings)
 
     return dct_constant
 
 
-def process_multiple_each_year():
+def process_multiple_each_year(sdf):
     """Employment Status for multiple weeks."""
     dct_multiple = dict()
 
     # The mapping between the continuous weeks counter and the calendar year is provided on the
     # NLSY website.
-    mapping_continuous_week = pd.read_pickle(
-        "../../sources/weekly_crosswalks" "/continuous_week_crosswalk_2012.pkl"
-    )
+    mapping_continuous_week = pd.read_pickle(WEEKLY_CROSSWALK_FILE)
     years = mapping_continuous_week["Week Start: \nYear"].unique()
 
     # Prepare container
@@ -160,12 +350,12 @@ def process_multiple_each_year():
                     substrings = ["HOURS AT ALL JOBS", substring_1, substring_2]
                 else:
                     raise AssertionError
-                dct_multiple[label][year] = get_name(substrings)
+                dct_multiple[label][year] = sdf.get_name(substrings)
 
     return dct_multiple
 
 
-def process_single_each_year():
+def process_single_each_year(sdf):
     """We process variables that vary by year, i.e. one variables is available each year."""
     # Initialize containers
     dct = dict()
@@ -173,201 +363,157 @@ def process_single_each_year():
     """ TOTAL INCOME FROM MILITARY SERVICE
     """
     substrings = "TOTAL INCOME FROM MILITARY SERVICE"
-    dct["INCOME_MILITARY"] = get_year_name(substrings)
+    dct["INCOME_MILITARY"] = sdf.get_year_name(substrings)
 
     """ HOURLY RATE OF PAY JOB ##
     """
     for i in range(1, 6):
         substrings = "HOURLY RATE OF PAY JOB #0" + str(i)
-        dct["WAGE_HOURLY_JOB_" + str(i)] = get_year_name(substrings)
+        dct["WAGE_HOURLY_JOB_" + str(i)] = sdf.get_year_name(substrings)
 
     """ ENROLLMENT STATUS AS OF MAY 1 SURVEY YEAR (REVISED)
     """
     substrings = "ENROLLMENT STATUS AS OF MAY 1 SURVEY YEAR (REVISED)"
-    dct["REVISED_ENROLLMENT_STATUS_MAY"] = get_year_name(substrings)
+    dct["REVISED_ENROLLMENT_STATUS_MAY"] = sdf.get_year_name(substrings)
 
     """ ENROLLMENT STATUS AS OF MAY 1 SURVEY YEAR (UNREVISED)
         """
     substrings = "ENROLLMENT STATUS AS OF MAY 1 SURVEY YEAR (UNREVISED)"
-    dct["UNREVISED_ENROLLMENT_STATUS_MAY"] = get_year_name(substrings)
+    dct["UNREVISED_ENROLLMENT_STATUS_MAY"] = sdf.get_year_name(substrings)
 
     """ HIGHEST GRADE ATTENDED
     """
     substrings = "HIGHEST GRADE ATTENDED"
-    dct["HIGHEST_GRADE_ATTENDED"] = get_year_name(substrings)
+    dct["HIGHEST_GRADE_ATTENDED"] = sdf.get_year_name(substrings)
 
     """ REVISED HIGHEST GRADE COMPLETED (MAY)
     """
     substrings = "HIGHEST GRADE COMPLETED AS OF MAY 1 SURVEY YEAR (REVISED)"
-    dct["REVISED_HIGHEST_GRADE_COMPLETED_MAY"] = get_year_name(substrings)
+    dct["REVISED_HIGHEST_GRADE_COMPLETED_MAY"] = sdf.get_year_name(substrings)
 
     """ UNREVISED HIGHEST GRADE COMPLETED (MAY)
         """
     substrings = "HIGHEST GRADE COMPLETED AS OF MAY 1 SURVEY YEAR (UNREVISED)"
-    dct["UNREVISED_HIGHEST_GRADE_COMPLETED_MAY"] = get_year_name(substrings)
+    dct["UNREVISED_HIGHEST_GRADE_COMPLETED_MAY"] = sdf.get_year_name(substrings)
 
     """ MONTH RECEIVED HIGHEST DEGREE
         """
     substrings = "MONTH RECEIVED HIGHEST DEGREE"
-    dct["MONTH_RECEIVED_HIGHEST_DEGREE"] = get_year_name(substrings)
+    dct["MONTH_RECEIVED_HIGHEST_DEGREE"] = sdf.get_year_name(substrings)
 
     """ YEAR RECEIVED HIGHEST DEGREE
         """
     substrings = "YEAR RECEIVED HIGHEST DEGREE"
-    dct["YEAR_RECEIVED_HIGHEST_DEGREE"] = get_year_name(substrings)
+    dct["YEAR_RECEIVED_HIGHEST_DEGREE"] = sdf.get_year_name(substrings)
 
     """ DOES R HAVE HIGH SCHOOL DIPLOMA OR EQUIVALENT?
             """
     substrings = "HIGH SCHOOL DIPLOMA OR EQUIVALENT?"
-    dct["OBTAINED_HS_OR_EQUIV"] = get_year_name(substrings)
+    dct["OBTAINED_HS_OR_EQUIV"] = sdf.get_year_name(substrings)
 
     """ WHICH DOES R HAVE - HIGH SCHOOL DIPLOMA OR GED?
             """
     substrings = "WHICH DOES R HAVE"
-    dct["WHICH_OF_HS_OR_GED"] = get_year_name(substrings)
+    dct["WHICH_OF_HS_OR_GED"] = sdf.get_year_name(substrings)
 
     """ MONTH LAST ENROLLED IN SCHOOL (NOT ENROLLED)
             """
     substrings = "Q3-2_M"
-    dct["MONTH_LAST_ENROLLED_SCHOOL"] = get_year_name(substrings)
+    dct["MONTH_LAST_ENROLLED_SCHOOL"] = sdf.get_year_name(substrings)
 
     """ YEAR LAST ENROLLED IN SCHOOL (NOT ENROLLED)
             """
     substrings = "Q3-2_Y"
-    dct["YEAR_LAST_ENROLLED_SCHOOL"] = get_year_name(substrings)
+    dct["YEAR_LAST_ENROLLED_SCHOOL"] = sdf.get_year_name(substrings)
 
     """ MONTH RECEIVED HIGH SCHOOL DIPLOMA OR GED
             """
     substrings = "Q3-8C_M"
-    dct["MONTH_RECEIVED_HS_OR_GED"] = get_year_name(substrings)
+    dct["MONTH_RECEIVED_HS_OR_GED"] = sdf.get_year_name(substrings)
 
     """ YEAR RECEIVED HIGH SCHOOL DIPLOMA OR GED
             """
     substrings = "Q3-8C_Y"
-    dct["YEAR_RECEIVED_HS_OR_GED"] = get_year_name(substrings)
+    dct["YEAR_RECEIVED_HS_OR_GED"] = sdf.get_year_name(substrings)
 
     """ DOES HEALTH LIMIT AMOUNT OF WORK R CAN DO?
                 """
     substrings = "HEALTH LIMIT AMOUNT OF WORK"
-    dct["AMOUNT_OF_WORK_LIMITED"] = get_year_name(substrings)
+    dct["AMOUNT_OF_WORK_LIMITED"] = sdf.get_year_name(substrings)
 
     """ DOES HEALTH LIMIT KIND OF WORK R CAN DO?
                     """
     substrings = "HEALTH LIMIT KIND OF WORK"
-    dct["KIND_OF_WORK_LIMITED"] = get_year_name(substrings)
+    dct["KIND_OF_WORK_LIMITED"] = sdf.get_year_name(substrings)
 
     """ YEAR OF BIRTH
     """
     substrings = "DATE OF BIRTH - YEAR"
-    dct["YEAR_OF_BIRTH"] = get_year_name(substrings)
+    dct["YEAR_OF_BIRTH"] = sdf.get_year_name(substrings)
 
     """ MONTH OF BIRTH
     """
     substrings = "DATE OF BIRTH - MONTH"
-    dct["MONTH_OF_BIRTH"] = get_year_name(substrings)
+    dct["MONTH_OF_BIRTH"] = sdf.get_year_name(substrings)
 
     """ CPSOCC70
     """
     substrings = "OCCUPATION AT CURRENT JOB/MOST RECENT JOB (70 CENSUS 3 DIGIT)"
-    dct["CPSOCC70"] = get_year_name(substrings)
+    dct["CPSOCC70"] = sdf.get_year_name(substrings)
 
     """ OCCALL70
     """
     for i in range(1, 6):
         substrings = ["OCCUPATION (CENSUS 3 DIGIT, 70 CODES)", "JOB #0" + str(i)]
-        dct["OCCALL70_JOB_" + str(i)] = get_year_name(substrings)
+        dct["OCCALL70_JOB_" + str(i)] = sdf.get_year_name(substrings)
 
     # In the year 1993, the substring is changed for some reason and cannot be easily
     # distinguished from the CPSOCC70 variable.
     for i in range(2, 6):
         substrings = "OCCUPATION (CENSUS 3 DIGIT) JOB #0" + str(i)
-        dct["OCCALL70_JOB_" + str(i)].update(get_year_name(substrings))
+        dct["OCCALL70_JOB_" + str(i)].update(sdf.get_year_name(substrings))
 
     # In the year 1982, the substring for the fourth job contains a 0 instead of an O.
     substrings = ["OCCUPATION (CENSUS 3 DIGIT, 70 C0DES)", "JOB #04"]
-    dct["OCCALL70_JOB_4"].update(get_year_name(substrings))
+    dct["OCCALL70_JOB_4"].update(sdf.get_year_name(substrings))
 
     """ OCCALL00
         """
     for i in range(1, 6):
         substrings = ["OCCUPATION (CENSUS 3 DIGIT, 00 CODES)", "JOB #0" + str(i)]
-        dct["OCCALL00_JOB_" + str(i)] = get_year_name(substrings)
+        dct["OCCALL00_JOB_" + str(i)] = sdf.get_year_name(substrings)
 
     """ OCCALL02
             """
     for i in range(1, 6):
         substrings = ["OCCUPATION (CENSUS 4 DIGIT, 00 CODES)", "JOB #0" + str(i)]
-        dct["OCCALL02_JOB_" + str(i)] = get_year_name(substrings)
+        dct["OCCALL02_JOB_" + str(i)] = sdf.get_year_name(substrings)
 
     """ LINKING OCALLEMP70 and CPSOCC7
     """
     for i in range(1, 6):
         substrings = ["IS JOB #0" + str(i) + " SAME AS CURRENT JOB?"]
-        dct["CPS_JOB_INDICATOR_JOB_" + str(i)] = get_year_name(substrings)
+        dct["CPS_JOB_INDICATOR_JOB_" + str(i)] = sdf.get_year_name(substrings)
 
     """ REASONS FOR NON-INTERVIEW
     """
     substrings = ["REASON FOR NONINTERVIEW"]
-    dct["REASON_NONINTERVIEW"] = get_year_name(substrings)
+    dct["REASON_NONINTERVIEW"] = sdf.get_year_name(substrings)
 
     """ TYPE OF RESIDENCE R IS LIVING IN
         """
     substrings = ["TYPE OF RESIDENCE"]
-    dct["TYPE_OF_RESIDENCE"] = get_year_name(substrings)
+    dct["TYPE_OF_RESIDENCE"] = sdf.get_year_name(substrings)
 
     """ MARITAL STATUS
             """
     substrings = ["MARITAL STATUS (COLLAPSED)"]
-    dct["MARITAL_STATUS"] = get_year_name(substrings)
+    dct["MARITAL_STATUS"] = sdf.get_year_name(substrings)
 
     return dct
 
 
-def get_name(substrings):
-    """Search through the file by substrings"""
-    # We allow to pass in a string or a list of strings that are checked in the variable
-    # descriptions.
-    if type(substrings) == str:
-        substrings = [substrings]
-
-    with open("../../sources/original_extended.sdf", "r") as infile:
-        for line in infile.readlines():
-            is_relevant = [substring in line for substring in substrings]
-            is_relevant = np.all(is_relevant)
-            if not is_relevant:
-                continue
-            # This special treatment is only required due to the string that identifiers RACE.
-            line = line.replace("'", "")
-            list_ = shlex.split(line)
-            name = list_[0].replace(".", "")
-
-            return name
-
-    raise AssertionError("Substrings not found ...")
-
-
-def get_year_name(substrings):
-    """Search through the file by substrings."""
-    # We allow to pass in a string or a list of strings that are checked in the variable
-    # descriptions.
-    if type(substrings) == str:
-        substrings = [substrings]
-
-    container = dict()
-    with open("../../sources/original_extended.sdf", "r") as infile:
-        for line in infile.readlines():
-            is_relevant = [substring in line for substring in substrings]
-            is_relevant = np.all(is_relevant)
-            if is_relevant:
-                list_ = shlex.split(line)
-                name = list_[0].replace(".", "")
-                year = int(list_[1])
-                container[year] = name
-
-    return container
-
-
-def process_highest_degree_received():
+def process_highest_degree_received(sdf):
     """This function processes the information on the highest degree ever received. There are
     two different variable in some years with the same information.
     """
@@ -375,19 +521,13 @@ def process_highest_degree_received():
     def read_highest_degree_received():
         """This method reads in the variable names for the highest grade received."""
         rslt = dict()
-        with open("../../sources/original_extended.sdf", "r") as infile:
-            for line in infile.readlines():
-                is_relevant = "HIGHEST DEGREE EVER RECEIVED" in line
-
-                if not is_relevant:
-                    continue
-
-                list_ = shlex.split(line)
-                variable, year = list_[0].replace(".", ""), int(list_[1])
-                if year not in rslt.keys():
-                    rslt[year] = []
+        for line in sdf.get_lines("HIGHEST DEGREE EVER RECEIVED"):
+            list_ = shlex.split(line)
+            variable, year = list_[0].replace(".", ""), int(list_[1])
+            if year not in rslt.keys():
+                rslt[year] = []
 
-                rslt[year] += [variable]
+            rslt[year] += [variable]
 
         return rslt
 
@@ -407,7 +547,7 @@ def process_highest_degree_received():
     return dct
 
 
-def process_school_enrollment_monthly():
+def process_school_enrollment_monthly(sdf):
     """This function processes the monthly school enrollment data. This is surprisingly
     difficult as, for example, information about March 1990 is asked in the surveys of 1990 and
     1991.
@@ -416,71 +556,64 @@ def process_school_enrollment_monthly():
     def read_school_enrollment_monthly():
         """Search for the information in the short description file."""
         rslt = dict()
-        with open("../../sources/original_extended.sdf", "r") as infile:
-            for line in infile.readlines():
-                is_relevant = "MONTHS ENROLLED IN SCHOOL SINCE LAST INT" in line
-                is_relevant = np.all(is_relevant)
-
-                if not is_relevant:
-                    continue
-
-                list_ = shlex.split(line)
-
-                # Collect information
-                variable, month = list_[0].replace(".", ""), list_[10]
-
-                if "R09052.00" in line:
-                    month, year = list_[12], int(list_[13])
-                # There are some typos in the variable descriptions
-                elif "INT-" in line:
-                    month, year = list_[9], int(list_[10])
-                else:
-
-                    year = int(list_[11])
-
-                # The labeling convention for the year are all over the place. For example 2012
-                # does show up as 12 as well.
-                if 0 <= year < 25:
-                    year += 2000
-                elif 70 < year < 100:
-                    year += 1900
-                else:
-                    pass
-
-                # The labeling convention for the month is not consistent.
-                if "JAN" in month:
-                    month = "JANUARY"
-                elif "FEB" in month:
-                    month = "FEBRUARY"
-                elif "MAR" in month:
-                    month = "MARCH"
-                elif "APR" in month:
-                    month = "APRIL"
-                elif "MAY" in month:
-                    month = "MAY"
-                elif "JUN" in month:
-                    month = "JUNE"
-                elif "JUL" in month:
-                    month = "JULY"
-                elif "AUG" in month:
-                    month = "AUGUST"
-                elif "SEP" in month:
-                    month = "SEPTEMBER"
-                elif "OCT" in month:
-                    month = "OCTOBER"
-                elif "NOV" in month:
-                    month = "NOVEMBER"
-                elif "DEC" in month:
-                    month = "DECEMBER"
-                else:
-                    raise AssertionError
-
-                if year not in rslt.keys():
-                    rslt[year] = dict()
-                if month not in rslt[year].keys():
-                    rslt[year][month] = []
+        for line in sdf.get_lines("MONTHS ENROLLED IN SCHOOL SINCE LAST INT"):
+            list_ = shlex.split(line)
 
-                rslt[year][month] += [variable]
+            # Collect information
+            variable, month = list_[0].replace(".", ""), list_[10]
+
+            if "R09052.00" in line:
+                month, year = list_[12], int(list_[13])
+            # There are some typos in the variable descriptions
+            elif "INT-" in line:
+                month, year = list_[9], int(list_[10])
+            else:
+
+                year = int(list_[11])
+
+            # The labeling convention for the year are all over the place. For example 2012
+            # does show up as 12 as well.
+            if 0 <= year < 25:
+                year += 2000
+            elif 70 < year < 100:
+                year += 1900
+            else:
+                pass
+
+            # The labeling convention for the month is not consistent.
+            if "JAN" in month:
+                month = "JANUARY"
+            elif "FEB" in month:
+                month = "FEBRUARY"
+            elif "MAR" in month:
+                month = "MARCH"
+            elif "APR" in month:
+                month = "APRIL"
+            elif "MAY" in month:
+                month = "MAY"
+            elif "JUN" in month:
+                month = "JUNE"
+            elif "JUL" in month:
+                month = "JULY"
+            elif "AUG" in month:
+                month = "AUGUST"
+            elif "SEP" in month:
+                month = "SEPTEMBER"
+            elif "OCT" in month:
+                month = "OCTOBER"
+            elif "NOV" in month:
+                month = "NOVEMBER"
+            elif "DEC" in month:
+                month = "DECEMBER"
+            else:
+                raise AssertionError
+
+            if year not in rslt.keys():
+                rslt[year] = dict()
+            if month not in rslt[year].keys():
+                rslt[year][month] = []
+
+            rslt[year][month] += [variable]
 
         return rslt
 
@@ -3,67 +3,53 @@ additional covariates.
 """
 
 import os
-import shutil
 from pathlib import Path
 
 import pandas as pd
 
 PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
 
-original_ext_df = pd.read_csv(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original.csv", index_col="R0000100"
-)
+SOURCES_DIR = f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources"
 
-# create short description file (sdf) which are is later to create variables
-shutil.copyfile(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original.sdf",
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original_extended.sdf",
-)
-file_dict = {}
+SUPPLEMENTARY_FILES = []
+SUPPLEMENTARY_FILES += ["unrevised_educ_vars", "additional_educ_vars"]
+SUPPLEMENTARY_FILES += ["labor_force_status_all_weeks", "health_vars", "marital_status"]
+SUPPLEMENTARY_FILES += ["illegal_activity", "Table_13_covariates"]
 
-with open(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/unrevised_educ_vars.sdf", "r"
-) as file:
-    filedata = file.read()
-    filedata = filedata.replace("SURVEY YEAR  ", "SURVEY YEAR (UNREVISED) ")
-with open(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/unrevised_educ_vars.sdf", "w"
-) as file:
-    file.write(filedata)
+original_ext_df = pd.read_csv(f"{SOURCES_DIR}/original.csv", index_col="R0000100")
 
-# create original_extended.csv by merging other csv-files
-for filename in [
-    "unrevised_educ_vars",
-    "additional_educ_vars",
-    "labor_force_status_all_weeks",
-    "health_vars",
-    "marital_status",
-    "illegal_activity",
-    "Table_13_covariates",
-]:
-    file_dict[filename] = pd.read_csv(
-        f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/{filename}.csv",
-        index_col="R0000100",
-    )
-    cols_to_use = file_dict[filename].columns.difference(original_ext_df.columns)
-    original_ext_df = original_ext_df.merge(
-        file_dict[filename][cols_to_use], on="R0000100", how="left"
-    )
-    original_ext_df = original_ext_df.loc[:, ~original_ext_df.columns.duplicated()]
+# We collect the additional covariates of all files and align them with the original sample in a
+# single concatenation. A variable that is available in several files is taken from the first one.
+columns = original_ext_df.columns
+frames = [original_ext_df]
+for filename in SUPPLEMENTARY_FILES:
+    df = pd.read_csv(f"{SOURCES_DIR}/{filename}.csv", index_col="R0000100")
+    cols_to_use = df.columns.difference(columns)
+    columns = columns.append(cols_to_use)
 
-    with open(
-        f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original_extended.sdf", "r"
-    ) as original_ext_description:
-        lineset = set(original_ext_description)
-    with open(
-        f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original_extended.sdf", "a"
-    ) as original_ext_description:
-        with open(f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/{filename}.sdf") as infile:
+    frames += [df[cols_to_use].reindex(original_ext_df.index)]
 
-            for line in infile:
-                if line not in lineset:
-                    original_ext_description.write(line)
+original_ext_df = pd.concat(frames, axis=1)
 
-original_ext_df.to_csv(
-    f"{PROJECT_DIR}/eckstein-keane-wolpin/material/sources/original_extended.csv"
-)
+original_ext_df.to_csv(f"{SOURCES_DIR}/original_extended.csv")
+
+# create short description file (sdf) which are is later to create variables, the lines of the
+# additional files are only added if they are not part of it yet.
+with open(f"{SOURCES_DIR}/original.sdf") as infile:
+    lines = infile.readlines()
+lineset = set(lines)
+
+for filename in SUPPLEMENTARY_FILES:
+    with open(f"{SOURCES_DIR}/{filename}.sdf") as infile:
+        filedata = infile.read()
+
+    if filename == "unrevised_educ_vars":
+        filedata = filedata.replace("SURVEY YEAR  ", "SURVEY YEAR (UNREVISED) ")
+
+    for line in filedata.splitlines(keepends=True):
+        if line not in lineset:
+            lines += [line]
+            lineset.add(line)
+
+with open(f"{SOURCES_DIR}/original_extended.sdf", "w") as outfile:
+    outfile.writelines(lines)
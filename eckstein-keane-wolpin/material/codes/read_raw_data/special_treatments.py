@@ -1,5 +1,6 @@
 """ This module contains some functionality for some special treatment that is required for a
-selected few variables.
+selected few variables. The panel is possibly constructed in batches of agents, so all treatments
+only use the information of each agent.
 """
 import numpy as np
 from numpy.testing import assert_equal
@@ -4,9 +4,19 @@ the wide format.
 """
 
 import os
+from pathlib import Path
+import runpy
 
+from pipeline import run_pipeline
+
+PROJECT_DIR = Path(os.environ["PROJECT_ROOT"])
+
+# The stages of both steps are run as one pipeline, so that stages which do not depend on the raw
+# panel dataset can start right away.
+STAGES = []
 for dir_ in ["read_raw_data", "process_data"]:
-    os.chdir("codes/" + dir_)
-    os.system("python create.py")
-    print(dir_ + "complete")
-    os.chdir("../../")
+    STAGES += runpy.run_path(f"codes/{dir_}/create.py")["STAGES"]
+
+run_pipeline(
+    STAGES, f"{PROJECT_DIR}/eckstein-keane-wolpin/material/output/data/pipeline_state.json"
+)
@@ -0,0 +1,188 @@
+"""This module provides the runner for the stages that construct the datasets. Each stage is a
+script that declares the files it reads and writes. The dependencies between the stages follow from
+these declarations.
+
+A stage is skipped if its outputs exist and neither the script nor any of its inputs changed since
+its last successful run. All other stages are executed as soon as the stages they depend on are
+complete, independent stages run concurrently in a pool of processes. This way, e.g. the crosswalk
+with the occupation categories is built alongside the preliminary adjustments and both are joined
+before the final cleaning.
+
+No further stages are started after the first failure and the stages that are waiting for a free
+process are cancelled. The stages that are already running are completed and recorded, so they are
+skipped in the next run, before the failure is reported.
+"""
+
+from collections import namedtuple
+from concurrent import futures
+from glob import glob
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import runpy
+import sys
+
+# On Linux, the stages are executed in worker processes that are forked from the runner, so they do
+# not have to import the scientific stack again. The runner itself does not compute anything, so no
+# thread pools of the numerical libraries are in use when it forks. On all other platforms, forking
+# is not safe (e.g. on macOS system libraries do not support it) and the workers are spawned.
+import numpy  # noqa: F401
+import pandas  # noqa: F401
+
+Stage = namedtuple("Stage", ["name", "directory", "inputs", "outputs"])
+
+CHUNK_SIZE = 2**24
+
+# The processes that are available to a stage for its own pool are passed on in this environment
+# variable. The processes are shared evenly between the stages that run concurrently.
+WORKERS_VARIABLE = "PIPELINE_STAGE_WORKERS"
+
+
+def run_pipeline(stages, fname_state, max_workers=None):
+    """This function runs all stages of the pipeline that are not up to date."""
+    stages = {stage.name: stage for stage in stages}
+    dependencies = get_dependencies(stages.values())
+
+    state = {}
+    if os.path.exists(fname_state):
+        with open(fname_state) as infile:
+            state = json.load(infile)
+
+    if max_workers is None:
+        max_workers = min(os.cpu_count(), len(stages))
+    num_workers_stage = max(1, os.cpu_count() // max_workers)
+
+    context = mp.get_context("fork" if sys.platform.startswith("linux") else "spawn")
+    with futures.ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+        complete, running, failure = set(), {}, None
+        while running or (failure is None and len(complete) < len(stages)):
+            for name, stage in stages.items():
+                if failure is not None:
+                    break
+                if name in complete or name in running.values():
+                    continue
+                if not dependencies[name] <= complete:
+                    continue
+
+                future = executor.submit(_run_stage, stage, state.get(name), num_workers_stage)
+                running[future] = name
+
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if future.cancelled():
+                    continue
+
+                if future.exception() is not None:
+                    if failure is None:
+                        failure = (name, future.exception())
+                        for pending in running:
+                            pending.cancel()
+                    continue
+
+                checksums = future.result()
+                if checksums is None:
+                    print(f"{name} skipped")
+                else:
+                    # The checksums are recorded after each stage, so a later failure does not
+                    # force the repetition of completed stages.
+                    state[name] = checksums
+                    with open(fname_state, "w") as outfile:
+                        json.dump(state, outfile, indent=4)
+
+                    print(f"{name} complete")
+
+                complete.add(name)
+
+    if failure is not None:
+        name, exception = failure
+        raise AssertionError(f"The stage {name} failed.") from exception
+
+
+def get_dependencies(stages):
+    """This function determines for each stage the stages that provide its inputs."""
+    producers = {}
+    for stage in stages:
+        for fname in stage.outputs:
+            if fname in producers.keys():
+                raise AssertionError(f"The file {fname} is created by more than one stage.")
+            producers[fname] = stage.name
+
+    dependencies = {}
+    for stage in stages:
+        dependencies[stage.name] = {producers[x] for x in stage.inputs if x in producers.keys()}
+
+    # We need to make sure that the pipeline can be completed.
+    complete = set()
+    while len(complete) < len(dependencies):
+        ready = {name for name in dependencies if dependencies[name] <= complete}
+        if ready <= complete:
+            raise AssertionError("The dependencies between the stages are circular.")
+        complete |= ready
+
+    return dependencies
+
+
+def get_checksums(stage):
+    """This function returns the checksums of the script and the inputs of a stage. An input can
+    be a pattern that matches several files, e.g. the shards of a source file, or a directory with
+    the partitions of a dataset.
+    """
+    fnames = [f"{stage.directory}/{stage.name}.py"]
+    for pattern in stage.inputs:
+        for fname in sorted(glob(pattern)) or [pattern]:
+            if os.path.isdir(fname):
+                fnames += sorted(glob(f"{fname}/*"))
+            else:
+                fnames += [fname]
+
+    checksums = {}
+    for fname in fnames:
+        if not os.path.exists(fname):
+            checksums[fname] = None
+            continue
+
+        checksum = hashlib.sha256()
+        with open(fname, "rb") as infile:
+            for chunk in iter(lambda: infile.read(CHUNK_SIZE), b""):
+                checksum.update(chunk)
+        checksums[fname] = checksum.hexdigest()
+
+    return checksums
+
+
+def is_up_to_date(stage, checksums, checksums_last_run):
+    """This function checks whether the outputs of a stage exist and were created from the
+    current script and inputs."""
+    if not all(os.path.exists(fname) for fname in stage.outputs):
+        return False
+
+    return checksums == checksums_last_run
+
+
+def _run_stage(stage, checksums_last_run, num_workers):
+    """This function executes the script of a stage as if it was run from its directory. It returns
+    the checksums of the script and the inputs, or None if the stage is up to date. The number of
+    processes that the stage may use for its own pool is set in WORKERS_VARIABLE.
+
+    The check is part of the task, so the scheduler does not have to wait for the checksums of large
+    inputs before it can start independent stages.
+    """
+    checksums = get_checksums(stage)
+    if is_up_to_date(stage, checksums, checksums_last_run):
+        return None
+
+    cwd, path, environ = os.getcwd(), sys.path.copy(), os.environ.copy()
+    try:
+        os.chdir(stage.directory)
+        sys.path.insert(0, stage.directory)
+        os.environ[WORKERS_VARIABLE] = str(num_workers)
+        runpy.run_path(f"{stage.name}.py", run_name="__main__")
+    finally:
+        os.chdir(cwd)
+        sys.path[:] = path
+        os.environ.clear()
+        os.environ.update(environ)
+
+    return checksums
@@ -0,0 +1,76 @@
+"""This module provides the execution of per-agent transformations of the panel in a pool of
+processes. The panel is split into shards of consecutive agents, each shard is transformed in a
+worker process and the results are merged in the original order of the agents.
+
+The workers are forked from the calling process, so they access the panel and the transformation
+without copying or serializing them. Only the transformed shards are returned to the calling
+process. As for the runner of the pipeline, forking is restricted to Linux and the transformation
+is applied in the calling process on all other platforms.
+
+Within the pipeline, the number of workers is limited to the share of the processes of the stage,
+so the stages that run concurrently do not start more processes than there are cores in total.
+"""
+
+from concurrent import futures
+import multiprocessing as mp
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# The panel and the transformation are shared with the forked workers through this attribute.
+_TASK = None
+
+# This environment variable is set by the runner of the pipeline for each stage.
+WORKERS_VARIABLE = "PIPELINE_STAGE_WORKERS"
+
+
+def apply_by_agent(df, func, max_workers=None):
+    """This function applies func to the observations of each agent. The result is the same as for
+    df.groupby(df["IDENTIFIER"]).apply(func), the observations of each agent need to be consecutive
+    which is the case for the panel sorted by its index.
+    """
+    global _TASK
+
+    if max_workers is None:
+        max_workers = int(os.environ.get(WORKERS_VARIABLE, os.cpu_count()))
+
+    bounds = get_shard_bounds(df["IDENTIFIER"].to_numpy(), max_workers)
+    if len(bounds) < 2 or not sys.platform.startswith("linux"):
+        return df.groupby(df["IDENTIFIER"]).apply(func)
+
+    _TASK = (df, func)
+    try:
+        context = mp.get_context("fork")
+        with futures.ProcessPoolExecutor(len(bounds), mp_context=context) as executor:
+            shards = list(executor.map(_apply_shard, bounds))
+    finally:
+        _TASK = None
+
+    return pd.concat(shards)
+
+
+def get_shard_bounds(identifiers, num_shards):
+    """This function splits the observations into at most num_shards shards of consecutive agents
+    with a similar number of agents. It returns the first and the last position (exclusive) of each
+    shard.
+    """
+    if len(identifiers) == 0:
+        return []
+
+    starts = np.flatnonzero(np.append(True, identifiers[1:] != identifiers[:-1]))
+    if len(starts) != len(np.unique(identifiers)):
+        raise AssertionError("The observations of each agent need to be consecutive.")
+
+    starts = [shard[0] for shard in np.array_split(starts, min(num_shards, len(starts)))]
+
+    return list(zip(starts, starts[1:] + [len(identifiers)]))
+
+
+def _apply_shard(bounds):
+    """This function applies the transformation to the agents of a shard in a worker process."""
+    df, func = _TASK
+    shard = df.iloc[slice(*bounds)]
+
+    return shard.groupby(shard["IDENTIFIER"]).apply(func)
@@ -0,0 +1,150 @@
+"""This module provides the storage layer for the datasets that are passed between the stages of
+the pipeline. The backend is selected by the file extension, so switching the format of a dataset
+only requires changing its file name.
+
+The columnar backends (.parquet, .feather) compress the data and support reading a subset of the
+columns from a memory-mapped file. The index is restored in all cases.
+
+A dataset that is constructed in batches is stored as partitions, i.e. a directory with the name
+of the dataset that contains one file of the same format for each batch. The partitions are
+concatenated in the order of the batches when the dataset is loaded.
+"""
+from pathlib import Path
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+from pyarrow import parquet as pq
+
+
+def store_dataset(df, fname):
+    """This function writes the dataset to the backend that belongs to the file extension."""
+    store, _ = _get_backend(fname)
+    _remove_dataset(fname)
+    store(df, fname)
+
+
+def store_partition(df, fname, num):
+    """This function writes a batch of a dataset as its partition with the number num. The first
+    partition replaces any previous version of the dataset.
+    """
+    store, _ = _get_backend(fname)
+    if num == 0:
+        _remove_dataset(fname)
+        Path(fname).mkdir(parents=True)
+
+    store(df, _get_partition(fname, num))
+
+
+def load_dataset(fname, columns=None):
+    """This function reads the dataset from the backend that belongs to the file extension.
+
+    If columns are specified, only these are loaded in addition to the index.
+    """
+    _, load = _get_backend(fname)
+    if not Path(fname).is_dir():
+        return load(fname, columns)
+
+    partitions = sorted(Path(fname).glob(f"part-*{Path(fname).suffix}"))
+    if not partitions:
+        raise AssertionError(f"There are no partitions available for {fname}.")
+
+    return pd.concat([load(str(partition), columns) for partition in partitions])
+
+
+def _get_backend(fname):
+    """This function returns the functions to store and load the dataset."""
+    suffix = Path(fname).suffix
+    if suffix not in BACKENDS.keys():
+        raise AssertionError(f"The file extension {suffix} is not supported by the storage layer.")
+
+    return BACKENDS[suffix]
+
+
+def _get_partition(fname, num):
+    """This function returns the name of the file that holds a partition of the dataset."""
+    return f"{fname}/part-{num:05d}{Path(fname).suffix}"
+
+
+def _remove_dataset(fname):
+    """This function removes a previous version of the dataset, which is either a single file or a
+    directory with its partitions.
+    """
+    if Path(fname).is_dir():
+        shutil.rmtree(fname)
+    elif Path(fname).exists():
+        Path(fname).unlink()
+
+
+def _store_pickle(df, fname):
+    df.to_pickle(fname)
+
+
+def _load_pickle(fname, columns):
+    df = pd.read_pickle(fname)
+    if columns is not None:
+        df = df[columns]
+
+    return df
+
+
+def _store_parquet(df, fname):
+    df.to_parquet(fname, compression="zstd")
+
+
+def _load_parquet(fname, columns):
+    df = pd.read_parquet(fname, columns=columns, memory_map=True)
+
+    return _restore_index_dtypes(df, pq.read_schema(fname, memory_map=True).pandas_metadata)
+
+
+def _store_feather(df, fname):
+    # The conversion to a table keeps the index in the pandas metadata of the schema, which
+    # DataFrame.to_feather does not allow.
+    feather.write_feather(pa.Table.from_pandas(df), fname, compression="zstd")
+
+
+def _load_feather(fname, columns):
+    with pa.memory_map(fname) as source:
+        metadata = pa.ipc.open_file(source).schema.pandas_metadata
+
+    if columns is not None:
+        index_columns = metadata["index_columns"]
+        columns = list(columns) + [name for name in index_columns if isinstance(name, str)]
+
+    df = feather.read_table(fname, columns=columns, memory_map=True).to_pandas()
+
+    return _restore_index_dtypes(df, metadata)
+
+
+def _restore_index_dtypes(df, metadata):
+    """This function restores the nullable types of the index levels, e.g. Int64, which the
+    columnar backends return as the corresponding NumPy types. The types are recorded in the pandas
+    metadata of the schema.
+    """
+    if metadata is None:
+        return df
+
+    dtypes = {column["field_name"]: column["numpy_type"] for column in metadata["columns"]}
+
+    levels, is_restored = [], False
+    for num, name in enumerate(metadata["index_columns"]):
+        level = df.index.get_level_values(num)
+        if isinstance(name, str):
+            dtype = pd.api.types.pandas_dtype(dtypes[name])
+            if isinstance(dtype, pd.api.extensions.ExtensionDtype) and level.dtype != dtype:
+                level, is_restored = level.astype(dtype), True
+        levels += [level]
+
+    if is_restored:
+        df.index = pd.MultiIndex.from_arrays(levels) if len(levels) > 1 else levels[0]
+
+    return df
+
+
+BACKENDS = {
+    ".pkl": (_store_pickle, _load_pickle),
+    ".parquet": (_store_parquet, _load_parquet),
+    ".feather": (_store_feather, _load_feather),
+}